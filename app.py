@@ -1,15 +1,59 @@
 import os
+import time
 import logging
-from flask import Flask, request, jsonify, render_template
+from datetime import date
+from flask import Flask, Response, g, request, jsonify, render_template, abort
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
 from scraper import GeeksforGeeksScraper
-from utils import validate_username, is_rate_limited
+from extraction_plan import compile_fields
+from streaming import NDJSON_MIMETYPE, wants_ndjson, ndjson_lines
+from utils import (
+    validate_username,
+    is_rate_limited,
+    batch_rate_limit_cost,
+    parse_batch_request,
+    rate_limiter,
+    SECTION_ROUTES,
+)
+from metrics import (
+    REGISTRY,
+    CONTENT_TYPE,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_REQUEST_DURATION,
+    register_service_collectors,
+    stage_timer,
+)
+from profiling import RequestProfiler, is_admin
+from history import create_history_store, parse_since
+from errors import error_status
+from leaderboard import LeaderboardIndex
+from serialization import (
+    FastJSONMixin,
+    ResponseCache,
+    encoded_response,
+    etag_matches,
+    make_etag,
+    not_modified_response,
+)
+from profile_model import profile_digest
 
-logging.basicConfig(level=logging.DEBUG)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+class TimedJSONProvider(FastJSONMixin, DefaultJSONProvider):
+
+    def response(self, *args, **kwargs):
+        with stage_timer("serialize"):
+            return super().response(*args, **kwargs)
+
+
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)  
 
@@ -18,6 +62,77 @@ CORS(app)
 
 # Initialize scraper
 scraper = GeeksforGeeksScraper()
+register_service_collectors(scraper, rate_limiter)
+leaderboard = LeaderboardIndex()
+scraper.add_listener(leaderboard.update)
+REGISTRY.register_collector("gfg_leaderboard", leaderboard.stats)
+history = create_history_store()
+if history is not None:
+    scraper.add_listener(history.record)
+    REGISTRY.register_collector("gfg_history", history.stats)
+profiler = RequestProfiler()
+responses = ResponseCache(app.json.encode)
+REGISTRY.register_collector("gfg_response_cache", responses.stats)
+
+def profile_response(username, section, fields=None):
+    """JSON for one section of a profile, with an ETag and freshness-based Cache-Control.
+
+    The ETag covers the profile's content digest, so If-None-Match is
+    answered with a 304 before anything is extracted or encoded. Encoded
+    and compressed bodies are cached under the same tag. The day is part
+    of it because streak figures are relative to today.
+    """
+    profile = scraper.get_profile(username)
+    etag = make_etag(profile_digest(profile), username, section, fields, date.today())
+    max_age = scraper.freshness(username)
+
+    tag = etag_matches(request.headers.get('If-None-Match'), etag)
+    if tag is not None:
+        return not_modified_response(app.response_class, tag, max_age)
+
+    encoded = responses.get(
+        etag, lambda: scraper.extract_section(profile, section, username, fields)
+    )
+    return encoded_response(
+        app.response_class, encoded, request.headers.get('Accept-Encoding'), etag, max_age
+    )
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    if not request.path.startswith('/admin/'):
+        g.profile_token = profiler.start(request.endpoint, request.headers)
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        HTTP_REQUEST_DURATION.labels(endpoint=endpoint).observe(time.perf_counter() - started)
+        HTTP_REQUESTS.labels(endpoint=endpoint, status=response.status_code).inc()
+    return response
+
+@app.after_request
+def add_cache_validators(response):
+    # Profile routes set their own ETag; other JSON can still be revalidated
+    if request.method != 'GET' or not request.path.startswith('/api/'):
+        return response
+    if response.status_code >= 400:
+        response.headers.setdefault('Cache-Control', 'no-store')
+    elif response.status_code == 200 and 'ETag' not in response.headers and not response.is_streamed:
+        etag = make_etag(response.get_data())
+        tag = etag_matches(request.headers.get('If-None-Match'), etag)
+        if tag is not None:
+            return not_modified_response(app.response_class, tag)
+        response.headers['ETag'] = f'"{etag}"'
+        response.headers.setdefault('Cache-Control', 'no-cache')
+    return response
+
+@app.teardown_request
+def finish_request(exc):
+    profiler.stop(g.pop('profile_token', None))
+    HTTP_REQUESTS_IN_FLIGHT.dec()
 
 @app.route('/')
 def index():
@@ -27,126 +142,223 @@ def index():
 def documentation():
     return render_template('documentation.html')
 
-@app.route('/api/profile', methods=['GET'])
-def get_profile():
+def handle_section(section, description):
     username = request.args.get('username')
     
     if not validate_username(username):
         return jsonify({"error": "Invalid username parameter"}), 400
     
+    # Only the full profile takes a field selection or streams
+    fields = None
+    if section == 'profile':
+        fields = request.args.get('fields')
+        try:
+            compile_fields(fields)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    
     if is_rate_limited(request.remote_addr):
         return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
     
     try:
-        profile_data = scraper.get_complete_profile(username)
-        return jsonify(profile_data)
+        if section == 'profile' and wants_ndjson(request.args, request.headers):
+            records = scraper.iter_complete_profile(username, fields=fields)
+            return Response(ndjson_lines(records), mimetype=NDJSON_MIMETYPE)
+
+        return profile_response(username, section, fields)
     except Exception as e:
-        logger.error(f"Error scraping profile for {username}: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        status = error_status(e)
+        log = logger.error if status >= 500 else logger.debug
+        log("Error scraping %s for %s: %s", description, username, e)
+        return jsonify({"error": str(e)}), status
 
-@app.route('/api/basic-info', methods=['GET'])
-def get_basic_info():
-    username = request.args.get('username')
-    
-    if not validate_username(username):
-        return jsonify({"error": "Invalid username parameter"}), 400
+def section_view(section, description):
+    return lambda: handle_section(section, description)
+
+for endpoint, path, section, description in SECTION_ROUTES:
+    app.add_url_rule(
+        path, endpoint, section_view(section, description), methods=['GET']
+    )
+
+@app.route('/api/profiles/batch', methods=['POST'])
+def get_profiles_batch():
+    usernames, sections, error = parse_batch_request(
+        request.get_json(silent=True), list(scraper.SECTION_EXTRACTORS)
+    )
+    if error:
+        return jsonify({"error": error}), 400
     
-    if is_rate_limited(request.remote_addr):
+    if is_rate_limited(request.remote_addr, cost=batch_rate_limit_cost(len(usernames))):
         return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
     
-    try:
-        basic_info = scraper.get_basic_info(username)
-        return jsonify(basic_info)
-    except Exception as e:
-        logger.error(f"Error scraping basic info for {username}: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+    if wants_ndjson(request.args, request.headers):
+        records = scraper.iter_batch(usernames, sections)
+        return Response(ndjson_lines(records), mimetype=NDJSON_MIMETYPE)
+    
+    results = scraper.get_batch(usernames, sections)
+    return jsonify({"results": results})
 
-@app.route('/api/coding-stats', methods=['GET'])
-def get_coding_stats():
+@app.route('/api/history', methods=['GET'])
+def get_history():
     username = request.args.get('username')
     
     if not validate_username(username):
         return jsonify({"error": "Invalid username parameter"}), 400
     
-    if is_rate_limited(request.remote_addr):
-        return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
+    if history is None:
+        return jsonify({"error": "Profile history is not enabled"}), 404
     
     try:
-        coding_stats = scraper.get_coding_stats(username)
-        return jsonify(coding_stats)
-    except Exception as e:
-        logger.error(f"Error scraping coding stats for {username}: {str(e)}")
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/submission-data', methods=['GET'])
-def get_submission_data():
-    username = request.args.get('username')
-    
-    if not validate_username(username):
-        return jsonify({"error": "Invalid username parameter"}), 400
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     if is_rate_limited(request.remote_addr):
         return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
     
-    try:
-        submission_data = scraper.get_submission_data(username)
-        return jsonify(submission_data)
-    except Exception as e:
-        logger.error(f"Error scraping submission data for {username}: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+    snapshots = history.history(username, since)
+    return jsonify({"username": username, "snapshots": snapshots})
 
-@app.route('/api/difficulty-stats', methods=['GET'])
-def get_difficulty_stats():
+@app.route('/api/delta', methods=['GET'])
+def get_delta():
     username = request.args.get('username')
     
     if not validate_username(username):
         return jsonify({"error": "Invalid username parameter"}), 400
     
-    if is_rate_limited(request.remote_addr):
-        return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
+    if history is None:
+        return jsonify({"error": "Profile history is not enabled"}), 404
     
     try:
-        difficulty_stats = scraper.get_difficulty_stats(username)
-        return jsonify(difficulty_stats)
-    except Exception as e:
-        logger.error(f"Error scraping difficulty stats for {username}: {str(e)}")
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/institution-languages', methods=['GET'])
-def get_institution_languages():
-    username = request.args.get('username')
-    
-    if not validate_username(username):
-        return jsonify({"error": "Invalid username parameter"}), 400
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     if is_rate_limited(request.remote_addr):
         return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
     
     try:
-        institution_languages = scraper.get_institution_languages(username)
-        return jsonify(institution_languages)
+        # Fetching records a new snapshot if the cached profile has expired
+        scraper.get_profile(username)
     except Exception as e:
-        logger.error(f"Error scraping institution and languages for {username}: {str(e)}")
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/streak', methods=['GET'])
-def get_streak():
-    username = request.args.get('username')
+        status = error_status(e)
+        log = logger.error if status >= 500 else logger.debug
+        log("Error scraping profile for %s: %s", username, e)
+        return jsonify({"error": str(e)}), status
     
-    # Validate username
-    if not validate_username(username):
-        return jsonify({"error": "Invalid username parameter"}), 400
+    delta = history.delta(username, since)
+    if delta is None:
+        return jsonify({"error": f"No history recorded for '{username}'"}), 404
+    return jsonify({"username": username, **delta})
+
+@app.route('/api/leaderboard', methods=['GET'])
+def get_leaderboard():
+    metric = request.args.get('metric', 'score')
+    institution = request.args.get('institution')
+    language = request.args.get('language')
+    limit = request.args.get('limit', 10, type=int)
     
-    # Check rate limiting
     if is_rate_limited(request.remote_addr):
         return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
     
     try:
-        streak_data = scraper.get_streak(username)
-        return jsonify(streak_data)
-    except Exception as e:
-        logger.error(f"Error scraping streak for {username}: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        entries = leaderboard.top(metric, limit, institution=institution, language=language)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "metric": metric,
+        "institution": institution,
+        "language": language,
+        "indexed_users": len(leaderboard),
+        "entries": entries,
+    })
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    stats = {}
+    if scraper.cache is not None:
+        stats["profile_cache"] = scraper.cache.stats()
+    stats["singleflight"] = scraper.singleflight.stats()
+    if scraper.store is not None:
+        stats["profile_store"] = scraper.store.stats()
+    if scraper.refresher is not None:
+        stats["refresher"] = scraper.refresher.stats()
+    if scraper.negative_cache is not None:
+        stats["negative_cache"] = scraper.negative_cache.stats()
+    stats["rate_limiter"] = rate_limiter.stats()
+    stats["upstream"] = scraper.upstream.stats()
+    stats["response_cache"] = responses.stats()
+    stats["leaderboard"] = leaderboard.stats()
+    if history is not None:
+        stats["history"] = history.stats()
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+def require_admin():
+    if not is_admin(request.headers):
+        abort(404)
+
+@app.route('/admin/profiler', methods=['GET'])
+def get_profiler():
+    require_admin()
+    return jsonify(profiler.stats())
+
+@app.route('/admin/profiler', methods=['POST'])
+def configure_profiler():
+    require_admin()
+    payload = request.get_json(silent=True) or {}
+    try:
+        profiler.configure(
+            payload.get('mode', 'off'),
+            sample_rate=payload.get('sample_rate'),
+            interval=payload.get('interval'),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if payload.get('reset'):
+        profiler.reset()
+    return jsonify(profiler.stats())
+
+@app.route('/admin/profiler', methods=['DELETE'])
+def reset_profiler():
+    require_admin()
+    profiler.reset()
+    return jsonify(profiler.stats())
+
+@app.route('/admin/profiler/<route>', methods=['GET'])
+def download_profile(route):
+    require_admin()
+    fmt = request.args.get('format', 'pstats')
+    if fmt == 'pstats':
+        data = profiler.dump_pstats(route)
+        mimetype = 'application/octet-stream'
+    elif fmt == 'collapsed':
+        data = profiler.dump_collapsed(route)
+        mimetype = 'text/plain'
+    elif fmt == 'text':
+        data = profiler.summary(route, limit=request.args.get('limit', 20, type=int))
+        mimetype = 'text/plain'
+    else:
+        return jsonify({"error": "format must be one of pstats, collapsed, text"}), 400
+
+    if data is None:
+        return jsonify({
+            "error": f"No {fmt} profile recorded for route '{route}'",
+            "pid": os.getpid(),
+        }), 404
+    extension = 'txt' if fmt == 'text' else fmt
+    return Response(
+        data,
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename={route}.{extension}",
+            "X-Profiler-Pid": str(os.getpid()),
+        },
+    )
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
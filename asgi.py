@@ -0,0 +1,317 @@
+import os
+import time
+import logging
+from datetime import date
+from quart import Quart, Response, g, request, jsonify, render_template
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
+from async_scraper import AsyncGeeksforGeeksScraper
+from extraction_plan import compile_fields
+from streaming import NDJSON_MIMETYPE, wants_ndjson, ndjson_lines, async_ndjson_lines
+from utils import (
+    validate_username,
+    is_rate_limited,
+    batch_rate_limit_cost,
+    parse_batch_request,
+    rate_limiter,
+    SECTION_ROUTES,
+)
+from metrics import (
+    REGISTRY,
+    CONTENT_TYPE,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_REQUEST_DURATION,
+    register_service_collectors,
+)
+from history import create_history_store, parse_since
+from ratelimit import SQLiteRateLimiter
+from errors import error_status
+from leaderboard import LeaderboardIndex
+from serialization import (
+    FastJSONMixin,
+    ResponseCache,
+    encoded_response,
+    etag_matches,
+    make_etag,
+    not_modified_response,
+)
+from profile_model import profile_digest
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+logging.basicConfig(level=LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+
+class FastJSONProvider(FastJSONMixin, DefaultJSONProvider):
+    pass
+
+
+# ASGI entry point serving the same API as app.py from a single event loop.
+# Run with: hypercorn asgi:app --bind 0.0.0.0:5000
+app = Quart(__name__)
+app.json = FastJSONProvider(app)
+app.secret_key = os.environ.get("SESSION_SECRET")
+
+# Enable CORS
+app = cors(app, allow_origin="*")
+
+# Initialize scraper
+scraper = AsyncGeeksforGeeksScraper()
+register_service_collectors(scraper, rate_limiter)
+leaderboard = LeaderboardIndex()
+scraper.add_listener(leaderboard.update)
+REGISTRY.register_collector("gfg_leaderboard", leaderboard.stats)
+history = create_history_store()
+if history is not None:
+    scraper.add_listener(history.record)
+    REGISTRY.register_collector("gfg_history", history.stats)
+responses = ResponseCache(app.json.encode)
+REGISTRY.register_collector("gfg_response_cache", responses.stats)
+
+
+async def rate_limited(cost=1):
+    # The sqlite backend can wait on its database lock; keep that off the loop
+    if isinstance(rate_limiter, SQLiteRateLimiter):
+        return await scraper.run_blocking(is_rate_limited, request.remote_addr, cost)
+    return is_rate_limited(request.remote_addr, cost)
+
+
+@app.after_serving
+async def close_scraper():
+    await scraper.close()
+
+
+@app.before_request
+async def start_request_timer():
+    g.request_started = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+
+
+@app.after_request
+async def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        HTTP_REQUEST_DURATION.labels(endpoint=endpoint).observe(time.perf_counter() - started)
+        HTTP_REQUESTS.labels(endpoint=endpoint, status=response.status_code).inc()
+    return response
+
+
+@app.after_request
+async def add_cache_validators(response):
+    # Profile routes set their own ETag; other JSON can still be revalidated
+    if request.method != 'GET' or not request.path.startswith('/api/'):
+        return response
+    if response.status_code >= 400:
+        response.headers.setdefault('Cache-Control', 'no-store')
+    elif response.status_code == 200 and 'ETag' not in response.headers and response.mimetype != NDJSON_MIMETYPE:
+        etag = make_etag(await response.get_data(as_text=False))
+        tag = etag_matches(request.headers.get('If-None-Match'), etag)
+        if tag is not None:
+            return not_modified_response(app.response_class, tag)
+        response.headers['ETag'] = f'"{etag}"'
+        response.headers.setdefault('Cache-Control', 'no-cache')
+    return response
+
+
+@app.teardown_request
+async def finish_request(exc):
+    HTTP_REQUESTS_IN_FLIGHT.dec()
+
+
+async def profile_response(username, section, fields=None):
+    # ETag, 304 and encoded-body caching as in app.profile_response
+    profile = await scraper.get_profile(username)
+    etag = make_etag(profile_digest(profile), username, section, fields, date.today())
+    max_age = await scraper.freshness(username)
+
+    tag = etag_matches(request.headers.get('If-None-Match'), etag)
+    if tag is not None:
+        return not_modified_response(app.response_class, tag, max_age)
+
+    encoded = responses.get(
+        etag, lambda: scraper.extract_section(profile, section, username, fields)
+    )
+    return encoded_response(
+        app.response_class, encoded, request.headers.get('Accept-Encoding'), etag, max_age
+    )
+
+
+async def handle_section(section, description):
+    username = request.args.get('username')
+
+    if not validate_username(username):
+        return jsonify({"error": "Invalid username parameter"}), 400
+
+    # Only the full profile takes a field selection or streams
+    fields = None
+    if section == 'profile':
+        fields = request.args.get('fields')
+        try:
+            compile_fields(fields)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    if await rate_limited():
+        return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
+
+    try:
+        if section == 'profile' and wants_ndjson(request.args, request.headers):
+            records = await scraper.iter_complete_profile(username, fields=fields)
+            return Response(ndjson_lines(records), mimetype=NDJSON_MIMETYPE)
+
+        return await profile_response(username, section, fields)
+    except Exception as e:
+        status = error_status(e)
+        log = logger.error if status >= 500 else logger.debug
+        log("Error scraping %s for %s: %s", description, username, e)
+        return jsonify({"error": str(e)}), status
+
+
+def section_view(section, description):
+    async def view():
+        return await handle_section(section, description)
+    return view
+
+
+for endpoint, path, section, description in SECTION_ROUTES:
+    app.add_url_rule(path, endpoint, section_view(section, description), methods=['GET'])
+
+
+@app.route('/')
+async def index():
+    return await render_template('index.html')
+
+@app.route('/docs')
+async def documentation():
+    return await render_template('documentation.html')
+
+@app.route('/api/profiles/batch', methods=['POST'])
+async def get_profiles_batch():
+    usernames, sections, error = parse_batch_request(
+        await request.get_json(silent=True), list(scraper.SECTION_EXTRACTORS)
+    )
+    if error:
+        return jsonify({"error": error}), 400
+
+    if await rate_limited(cost=batch_rate_limit_cost(len(usernames))):
+        return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
+
+    if wants_ndjson(request.args, request.headers):
+        records = scraper.iter_batch(usernames, sections)
+        return Response(async_ndjson_lines(records), mimetype=NDJSON_MIMETYPE)
+
+    results = await scraper.get_batch(usernames, sections)
+    return jsonify({"results": results})
+
+@app.route('/api/history', methods=['GET'])
+async def get_history():
+    username = request.args.get('username')
+
+    if not validate_username(username):
+        return jsonify({"error": "Invalid username parameter"}), 400
+
+    if history is None:
+        return jsonify({"error": "Profile history is not enabled"}), 404
+
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if await rate_limited():
+        return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
+
+    snapshots = await scraper.run_blocking(history.history, username, since)
+    return jsonify({"username": username, "snapshots": snapshots})
+
+@app.route('/api/delta', methods=['GET'])
+async def get_delta():
+    username = request.args.get('username')
+
+    if not validate_username(username):
+        return jsonify({"error": "Invalid username parameter"}), 400
+
+    if history is None:
+        return jsonify({"error": "Profile history is not enabled"}), 404
+
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if await rate_limited():
+        return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
+
+    try:
+        # Fetching records a new snapshot if the cached profile has expired
+        await scraper.get_profile(username)
+    except Exception as e:
+        status = error_status(e)
+        log = logger.error if status >= 500 else logger.debug
+        log("Error scraping profile for %s: %s", username, e)
+        return jsonify({"error": str(e)}), status
+
+    delta = await scraper.run_blocking(history.delta, username, since)
+    if delta is None:
+        return jsonify({"error": f"No history recorded for '{username}'"}), 404
+    return jsonify({"username": username, **delta})
+
+@app.route('/api/leaderboard', methods=['GET'])
+async def get_leaderboard():
+    metric = request.args.get('metric', 'score')
+    institution = request.args.get('institution')
+    language = request.args.get('language')
+    limit = request.args.get('limit', 10, type=int)
+
+    if await rate_limited():
+        return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
+
+    try:
+        entries = leaderboard.top(metric, limit, institution=institution, language=language)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "metric": metric,
+        "institution": institution,
+        "language": language,
+        "indexed_users": len(leaderboard),
+        "entries": entries,
+    })
+
+@app.route('/api/stats', methods=['GET'])
+async def get_stats():
+    # Several collectors query their SQLite databases
+    return jsonify(await scraper.run_blocking(collect_stats))
+
+
+def collect_stats():
+    stats = {}
+    if scraper.cache is not None:
+        stats["profile_cache"] = scraper.cache.stats()
+    stats["singleflight"] = scraper.singleflight.stats()
+    if scraper.store is not None:
+        stats["profile_store"] = scraper.store.stats()
+    if scraper.refresher is not None:
+        stats["refresher"] = scraper.refresher.stats()
+    if scraper.negative_cache is not None:
+        stats["negative_cache"] = scraper.negative_cache.stats()
+    stats["rate_limiter"] = rate_limiter.stats()
+    stats["upstream"] = scraper.upstream.stats()
+    stats["response_cache"] = responses.stats()
+    stats["leaderboard"] = leaderboard.stats()
+    if history is not None:
+        stats["history"] = history.stats()
+    return stats
+
+@app.route('/metrics', methods=['GET'])
+async def get_metrics():
+    return Response(await scraper.run_blocking(REGISTRY.render), content_type=CONTENT_TYPE)
+
+
+if __name__ == "__main__":
+    port = int(os.environ.get("PORT", 5000))
+    app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,361 @@
+import os
+import json
+import asyncio
+import logging
+import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from scraper import GeeksforGeeksScraper
+from singleflight import AsyncSingleFlight
+from refresher import AsyncBackgroundRefresher
+from shared_cache import SharedProfileCache
+from upstream import RETRY_STATUSES, UPSTREAM_TIMEOUT, SQLiteTokenBucket
+from metrics import UPSTREAM_RESPONSES
+from utils import validate_username
+from extraction_plan import compile_fields
+from next_data import NextDataReader, NEXT_DATA_CHUNK_SIZE
+from errors import (
+    ScraperError,
+    ProfileNotFoundError,
+    ProfileParseError,
+    UpstreamError,
+    UpstreamTimeoutError,
+    error_status,
+)
+
+logger = logging.getLogger(__name__)
+
+ASYNC_MAX_CONCURRENCY = int(os.getenv("ASYNC_MAX_CONCURRENCY", 100))
+ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", 100))
+ASYNC_KEEPALIVE_TIMEOUT = float(os.getenv("ASYNC_KEEPALIVE_TIMEOUT", 30))
+ASYNC_BLOCKING_THREADS = int(os.getenv("ASYNC_BLOCKING_THREADS", 4))
+
+
+class AsyncGeeksforGeeksScraper(GeeksforGeeksScraper):
+    """asyncio variant of GeeksforGeeksScraper built on a pooled aiohttp session.
+
+    Exposes the same ``get_*`` methods as coroutines and reuses the parsing,
+    caching and extraction logic of the synchronous scraper. Calls into the
+    SQLite-backed components (profile store, shared cache, shared token
+    bucket, history listeners) run on a small thread pool via
+    ``run_blocking``, so a locked database never stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        cache=None,
+        max_concurrency=ASYNC_MAX_CONCURRENCY,
+        pool_size=ASYNC_POOL_SIZE,
+        keepalive_timeout=ASYNC_KEEPALIVE_TIMEOUT,
+        timeout=UPSTREAM_TIMEOUT,
+    ):
+        super().__init__(cache=cache, singleflight=AsyncSingleFlight())
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._http = None
+        self._semaphore = None
+        self._blocking_executor = None
+        self._cache_blocks = isinstance(self.cache, SharedProfileCache)
+        self._bucket_blocks = isinstance(self.upstream.bucket, SQLiteTokenBucket)
+
+    def _get_http_session(self):
+        # aiohttp sessions are bound to the running loop, so create lazily
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                headers=self._default_headers(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def run_blocking(self, fn, *args):
+        """Run a blocking call (SQLite I/O) on the scraper's thread pool"""
+        if self._blocking_executor is None:
+            self._blocking_executor = ThreadPoolExecutor(
+                max_workers=ASYNC_BLOCKING_THREADS,
+                thread_name_prefix="gfg-blocking",
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._blocking_executor, lambda: fn(*args))
+
+    async def close(self):
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self.session.close()
+        if self._blocking_executor is not None:
+            self._blocking_executor.shutdown(wait=False)
+            self._blocking_executor = None
+
+    async def _get_profile_data(self, username):
+
+        if self.cache is not None:
+            allow_stale = self.refresher is not None
+            if self._cache_blocks:
+                cached, stale = await self.run_blocking(self.cache.lookup, username, allow_stale)
+            else:
+                cached, stale = self.cache.lookup(username, allow_stale)
+            if cached is not None:
+                if stale:
+                    logger.debug("Serving stale profile for %s", username)
+                    self.refresher.submit(username)
+                else:
+                    logger.debug("Profile cache hit for %s", username)
+                return cached
+
+        if self.negative_cache is not None and username in self.negative_cache:
+            logger.debug("Negative cache hit for %s", username)
+            raise ProfileNotFoundError(f"Profile '{username}' does not exist")
+
+        data, size = await self.singleflight.do(
+            username, lambda: self._fetch_and_cache(username)
+        )
+        return data
+
+    def _create_refresher(self):
+
+        return AsyncBackgroundRefresher(self._refresh_profile)
+
+    async def _refresh_profile(self, username):
+
+        await self.singleflight.do(
+            username, lambda: self._fetch_and_cache(username, revalidate=True)
+        )
+
+    async def _fetch_and_cache(self, username, revalidate=False):
+
+        try:
+            data, size = await self._fetch_profile_data(username, revalidate)
+        except ProfileNotFoundError:
+            if self.negative_cache is not None:
+                self.negative_cache.add(username)
+            raise
+        if self.negative_cache is not None:
+            self.negative_cache.discard(username)
+
+        if self.cache is not None:
+            if self._cache_blocks:
+                await self.run_blocking(self.cache.set, username, data, size)
+            else:
+                self.cache.set(username, data, size)
+
+        # Listeners may write to SQLite (profile history)
+        if self.listeners:
+            await self.run_blocking(self._notify_listeners, username, data)
+        return data, size
+
+    async def _fetch_profile_data(self, username, revalidate=False):
+
+        stored = None
+        if self.store is not None:
+            stored = await self.run_blocking(self.store.get, username)
+        # Refreshes always ask upstream, conditionally if a copy is stored
+        if stored is not None and not revalidate and self.store.is_fresh(stored):
+            logger.debug("Profile store hit for %s", username)
+            self.store.hits += 1
+            return self._load_stored_profile(stored)
+
+        url = f"{self.BASE_URL}{username}/"
+        logger.debug("Fetching profile from URL: %s", url)
+        headers = stored.conditional_headers() if stored is not None else None
+
+        try:
+            status, response_headers, reader = await self._upstream_get(url, headers)
+            if status == 304 and stored is not None:
+                logger.debug("Profile for %s not modified upstream", username)
+                await self.run_blocking(self.store.touch, username)
+                return self._load_stored_profile(stored)
+
+            self._check_status(status, username)
+            profile, json_data = self._parse_next_data(reader, username)
+
+            if self.store is not None:
+                await self.run_blocking(
+                    self.store.put,
+                    username,
+                    json_data,
+                    response_headers.get("ETag"),
+                    response_headers.get("Last-Modified"),
+                )
+
+            return profile, profile.approx_size()
+
+        except asyncio.TimeoutError as e:
+            # asyncio timeouts carry no message
+            message = str(e) or f"timed out after {self.timeout}s"
+            logger.error("Request timed out: %s", message)
+            raise UpstreamTimeoutError(f"Failed to fetch profile: {message}")
+        except aiohttp.ClientError as e:
+            logger.error("Request error: %s", e)
+            raise UpstreamError(f"Failed to fetch profile: {str(e)}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error("Error parsing JSON: %s", e)
+            raise ProfileParseError(f"Failed to parse profile data: {str(e)}")
+        except ScraperError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            raise
+
+    async def _upstream_get(self, url, headers):
+        """GET a page through the shared throttle, retry policy and circuit breaker.
+
+        Returns (status, response headers, NextDataReader fed with the body;
+        left empty for error statuses).
+        """
+        http = self._get_http_session()
+        upstream = self.upstream
+        attempt = 0
+
+        while True:
+            if self._bucket_blocks:
+                wait = await self.run_blocking(upstream.before_request)
+            else:
+                wait = upstream.before_request()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            retry_after = None
+            upstream.track_in_flight(1)
+            try:
+                async with self._semaphore:
+                    async with http.get(url, headers=headers) as response:
+                        UPSTREAM_RESPONSES.labels(status=response.status).inc()
+                        if response.status not in RETRY_STATUSES:
+                            upstream.breaker.record_success()
+                            reader = NextDataReader()
+                            if response.status >= 400:
+                                # Error statuses are rejected without the page
+                                return response.status, response.headers, reader
+                            async for chunk in response.content.iter_chunked(
+                                NEXT_DATA_CHUNK_SIZE
+                            ):
+                                if reader.feed(chunk):
+                                    break
+                            return response.status, response.headers, reader
+
+                        upstream.record_failure()
+                        if attempt >= upstream.max_retries:
+                            return response.status, response.headers, NextDataReader()
+                        retry_after = response.headers.get("Retry-After")
+                        logger.warning(
+                            "Upstream returned %s for %s, retrying", response.status, url
+                        )
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                UPSTREAM_RESPONSES.labels(status="error").inc()
+                upstream.record_failure()
+                retryable = isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+                if not retryable or attempt >= upstream.max_retries:
+                    raise
+                logger.warning("Upstream request failed (%s), retrying", e)
+            finally:
+                upstream.track_in_flight(-1)
+
+            upstream.record_retry()
+            await asyncio.sleep(upstream.backoff(attempt, retry_after))
+            attempt += 1
+
+    async def get_profile(self, username):
+
+        return await self._get_profile_data(username)
+
+    async def freshness(self, username):
+        """Seconds the cached profile for username stays fresh; 0 if uncached or stale"""
+        if self._cache_blocks:
+            return await self.run_blocking(super().freshness, username)
+        return super().freshness(username)
+
+    async def get_complete_profile(self, username, fields=None):
+
+        profile_data = await self._get_profile_data(username)
+        return self._build_complete_profile(
+            profile_data, username, compile_fields(fields)
+        )
+
+    async def iter_complete_profile(self, username, fields=None):
+
+        profile_data = await self._get_profile_data(username)
+        return self._iter_complete_profile(
+            profile_data, username, compile_fields(fields)
+        )
+
+    async def get_basic_info(self, username):
+
+        profile_data = await self._get_profile_data(username)
+        return self._extract_user_info(profile_data, username)
+
+    async def get_coding_stats(self, username):
+
+        profile_data = await self._get_profile_data(username)
+        return self._extract_next_coding_stats(profile_data)
+
+    async def get_submission_data(self, username):
+
+        profile_data = await self._get_profile_data(username)
+        return self._extract_next_submission_data(profile_data)
+
+    async def get_difficulty_stats(self, username):
+
+        profile_data = await self._get_profile_data(username)
+        return self._extract_next_difficulty_stats(profile_data)
+
+    async def get_institution_languages(self, username):
+
+        profile_data = await self._get_profile_data(username)
+        return self._extract_next_institution_languages(profile_data)
+
+    async def get_streak(self, username):
+
+        profile_data = await self._get_profile_data(username)
+        return self._extract_next_streak(profile_data)
+
+    async def get_sections(self, username, sections):
+
+        profile_data = await self._get_profile_data(username)
+        return self._extract_sections(profile_data, sections, username)
+
+    async def get_batch(self, usernames, sections):
+        """Fetch sections for many usernames concurrently, one entry per username"""
+        limit = asyncio.Semaphore(self.batch_max_workers)
+
+        async def entry(username):
+            async with limit:
+                return await self._batch_entry(username, sections)
+
+        return await asyncio.gather(*(entry(username) for username in usernames))
+
+    async def iter_batch(self, usernames, sections):
+        """Like get_batch, but yield each entry as soon as it completes"""
+        limit = asyncio.Semaphore(self.batch_max_workers)
+
+        async def entry(username):
+            async with limit:
+                return await self._batch_entry(username, sections)
+
+        tasks = [asyncio.ensure_future(entry(username)) for username in usernames]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _batch_entry(self, username, sections):
+
+        if not validate_username(username):
+            return {"username": username, "error": "Invalid username parameter", "status": 400}
+
+        try:
+            data = await self.get_sections(username, sections)
+            return {"username": username, "data": data}
+        except Exception as e:
+            status = error_status(e)
+            log = logger.error if status >= 500 else logger.debug
+            log("Error scraping batch entry for %s: %s", username, e)
+            return {"username": username, "error": str(e), "status": status}
@@ -0,0 +1,76 @@
+"""Time leaderboard updates and top-N queries over many indexed profiles.
+
+Usage: python benchmarks/bench_leaderboard.py [--users N] [--queries N]
+
+Profiles are synthetic: random scores, one of a few hundred institutions
+and two or three of a handful of languages each.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import LeaderboardIndex  # noqa: E402
+from profile_model import Profile  # noqa: E402
+
+LANGUAGES = ("C++", "Java", "Python", "JavaScript", "C", "Go", "Kotlin")
+
+
+def make_profile(rng, institutions):
+    profile = Profile.__new__(Profile)
+    profile.institution = rng.choice(institutions)
+    profile.languages = tuple(rng.sample(LANGUAGES, rng.randint(2, 3)))
+    profile.score = rng.randint(0, 5000)
+    profile.problems_solved = rng.randint(0, 2000)
+    profile.contest_rating = rng.choice((None, rng.randint(800, 2800)))
+    profile.monthly_score = rng.randint(0, 300)
+    return profile
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    institutions = [f"Institute {i}" for i in range(300)]
+    profiles = [(f"user{i}", make_profile(rng, institutions)) for i in range(args.users)]
+
+    index = LeaderboardIndex()
+    start = time.perf_counter()
+    for username, profile in profiles:
+        index.update(username, profile)
+    elapsed = time.perf_counter() - start
+    print(f"initial load: {args.users} users in {elapsed:.2f}s "
+          f"({elapsed / args.users * 1e6:.1f} us/update)")
+
+    refreshed = rng.sample(profiles, min(args.queries, len(profiles)))
+    iterator = iter(refreshed)
+    print(f"re-update:      {per_call_us(lambda: index.update(*next(iterator)), len(refreshed)):8.1f} us")
+
+    queries = {
+        "top 10 score": lambda: index.top("score", 10),
+        "top 100 rating": lambda: index.top("current_rating", 100),
+        "institution": lambda: index.top("score", 10, institution=rng.choice(institutions)),
+        "language": lambda: index.top("total_problems_solved", 10, language="Go"),
+        "institution+lang": lambda: index.top(
+            "monthly_score", 10, institution=rng.choice(institutions), language="Python"
+        ),
+    }
+    for name, query in queries.items():
+        print(f"{name + ':':<16} {per_call_us(query, args.queries):8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Time repeated lookups of nonexistent usernames with and without the negative cache.
+
+Usage: python benchmarks/bench_negative_cache.py [--names N] [--repeats N] [--latency MS]
+                                                 [--bloom-names N]
+
+Every username on the in-process stub server is missing. Each scraper looks
+up ``--names`` usernames ``--repeats`` times; the figures are wall time per
+lookup and how many requests reached the stub. The second part times
+NegativeCache membership tests on their own: an exact hit, a Bloom hit
+(a name the LRU has evicted) and a name that was never added.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("UPSTREAM_RATE", str(10 ** 6))
+os.environ.setdefault("UPSTREAM_BURST", str(10 ** 6))
+
+from stub_server import StubOptions, start_stub_server  # noqa: E402
+from scraper import GeeksforGeeksScraper  # noqa: E402
+from negative_cache import NegativeCache  # noqa: E402
+from errors import ProfileNotFoundError  # noqa: E402
+
+
+def run_lookups(scraper, server, usernames, repeats):
+    before = server.requests
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for username in usernames:
+            try:
+                scraper.get_profile(username)
+            except ProfileNotFoundError:
+                pass
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeats * len(usernames)), server.requests - before
+
+
+def per_call_us(fn, values):
+    start = time.perf_counter()
+    for value in values:
+        fn(value)
+    return (time.perf_counter() - start) / len(values) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=20.0, help="stub latency (ms)")
+    parser.add_argument("--bloom-names", type=int, default=100_000)
+    args = parser.parse_args()
+
+    server = start_stub_server(options=StubOptions(latency=args.latency / 1000, missing_rate=1.0))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/user/"
+    usernames = [f"ghost_{i}" for i in range(args.names)]
+
+    lookups = args.names * args.repeats
+    print(f"{lookups} lookups of {args.names} missing usernames, stub latency {args.latency}ms")
+    for name, negative_cache in (
+        ("uncached", NegativeCache(ttl=0)),
+        ("negative cache", NegativeCache()),
+    ):
+        scraper = GeeksforGeeksScraper(negative_cache=negative_cache)
+        scraper.BASE_URL = base_url
+        seconds, upstream = run_lookups(scraper, server, usernames, args.repeats)
+        print(f"{name:<16} {seconds * 1e3:8.3f} ms/lookup  {upstream:6d} upstream requests")
+    server.shutdown()
+
+    # Bloom tier: the exact LRU holds a tenth of the names, ~10 bits per name
+    negative = NegativeCache(
+        max_entries=args.bloom_names // 10, bloom_bits=args.bloom_names * 10
+    )
+    added = [f"missing_{i}" for i in range(args.bloom_names)]
+    for username in added:
+        negative.add(username)
+    never = [f"present_{i}" for i in range(args.bloom_names)]
+    false_positives = sum(username in negative for username in never)
+    exact = added[-len(added) // 10:]
+    evicted = added[:len(added) // 10]
+
+    print(f"\nmembership over {args.bloom_names} names "
+          f"(LRU of {len(added) // 10}, {args.bloom_names * 10 // 8 // 1024} KiB Bloom filter)")
+    print(f"exact hit        {per_call_us(negative.__contains__, exact):8.2f} us")
+    print(f"bloom hit        {per_call_us(negative.__contains__, evicted):8.2f} us")
+    print(f"absent           {per_call_us(negative.__contains__, never):8.2f} us")
+    print(f"false positives  {false_positives / len(never):8.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare __NEXT_DATA__ extraction: legacy regex over decoded text vs NextDataReader.
+
+Usage: python benchmarks/bench_next_data.py [--saved-dir DIR] [--repeat N]
+
+Synthetic pages of several sizes are always included; pass --saved-dir to add
+pages saved from the live site (``*.html``).
+"""
+import os
+import re
+import sys
+import json
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from next_data import NextDataReader, NEXT_DATA_CHUNK_SIZE  # noqa: E402
+from sample_pages import make_page, load_saved_pages  # noqa: E402
+
+LEGACY_PATTERN = r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>'
+
+
+def legacy_extract(content):
+    # What the scraper used to do: response.text, regex, then a second full scan
+    text = content.decode("utf-8")
+    match = re.search(LEGACY_PATTERN, text, re.DOTALL)
+    data = json.loads(match.group(1))
+    missing = "Profile does not exist" in text
+    return data, missing
+
+
+def reader_extract(content, chunk_size=NEXT_DATA_CHUNK_SIZE):
+    reader = NextDataReader()
+    for offset in range(0, len(content), chunk_size):
+        if reader.feed(content[offset:offset + chunk_size]):
+            break
+    missing = reader.profile_missing()
+    return json.loads(reader.json_bytes()), missing
+
+
+def bench(name, content, repeat):
+    assert legacy_extract(content) == reader_extract(content)
+    legacy = min(timeit.repeat(lambda: legacy_extract(content), number=1, repeat=repeat))
+    reader = min(timeit.repeat(lambda: reader_extract(content), number=1, repeat=repeat))
+    print(
+        f"{name:<28} {len(content) / 1024:>9.1f} KiB "
+        f"{legacy * 1000:>10.3f} ms {reader * 1000:>10.3f} ms {legacy / reader:>7.2f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saved-dir", help="directory of saved profile pages (*.html)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = {
+        f"synthetic solved={solved}": make_page(solved=solved)
+        for solved in (50, 500, 2000, 5000)
+    }
+    pages.update(load_saved_pages(args.saved_dir))
+
+    print(f"{'page':<28} {'size':>13} {'regex':>13} {'reader':>13} {'speedup':>8}")
+    for name, content in pages.items():
+        bench(name, content, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Time building problem lists for large profiles: per-endpoint passes vs shared lists.
+
+Usage: python benchmarks/bench_problem_lists.py [--repeat N]
+
+"legacy" is the old per-request code path: submission data and difficulty
+stats each walked userSubmissionsInfo and formatted their own URLs. "model"
+is the one-off cost of building the Profile when it is fetched; "render"
+renders both lists from it; "warm" is a repeat request for a cached
+profile, which reuses the rendered lists.
+"""
+import os
+import sys
+import json
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profile_model  # noqa: E402
+from profile_model import Profile, PROBLEM_URL, PRACTICE_PROBLEM_URL  # noqa: E402
+from sample_pages import make_next_data  # noqa: E402
+
+DIFFICULTIES = (("Basic", "basic"), ("Easy", "easy"), ("Medium", "medium"), ("Hard", "hard"))
+
+
+def legacy_lists(data, host):
+    submissions_info = data["props"]["pageProps"]["userSubmissionsInfo"]
+    lists = {key: [] for _, key in DIFFICULTIES}
+    for difficulty, key in DIFFICULTIES:
+        for problem_data in (submissions_info.get(difficulty) or {}).values():
+            name = problem_data.get("pname", "")
+            slug = problem_data.get("slug", "")
+            if name and slug:
+                lists[key].append({"name": name, "url": f"https://{host}/problems/{slug}/0"})
+    return lists
+
+
+def legacy(data):
+    return (
+        legacy_lists(data, "practice.geeksforgeeks.org"),
+        legacy_lists(data, "www.geeksforgeeks.org"),
+    )
+
+
+def render(profile):
+    return (
+        profile_model.problem_lists(profile, PRACTICE_PROBLEM_URL),
+        profile_model.problem_lists(profile, PROBLEM_URL),
+    )
+
+
+def render_cold(profile):
+    profile._problem_lists = None
+    return render(profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    def best(fn):
+        return min(timeit.repeat(fn, number=1, repeat=args.repeat)) * 1000
+
+    print(f"{'solved':>7} {'legacy ms':>10} {'model ms':>9} {'render ms':>10} {'warm ms':>9}")
+    for solved in (1000, 5000, 10000):
+        data = make_next_data(solved=solved)
+        profile = Profile.from_next_data(data)
+        assert json.dumps(legacy(data)) == json.dumps(render_cold(profile))
+
+        print(
+            f"{solved:>7} {best(lambda: legacy(data)):>10.2f} "
+            f"{best(lambda: Profile.from_next_data(data)):>9.2f} "
+            f"{best(lambda: render_cold(profile)):>10.2f} {best(lambda: render(profile)):>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Memory retained per cached profile: raw __NEXT_DATA__ dict vs the Profile model.
+
+Usage: python benchmarks/bench_profile_memory.py [--profiles N]
+
+Builds N synthetic profiles per size and measures, with tracemalloc, what
+stays allocated while all of them are held, as a cache would hold them.
+"""
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profile_model import Profile  # noqa: E402
+from sample_pages import make_next_data  # noqa: E402
+
+
+def retained(build, payloads):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = [build(payload) for payload in payloads]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(held), held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'solved':>7} {'json KiB':>9} {'raw dict KiB':>13} {'Profile KiB':>12} {'ratio':>7}")
+    for solved in (50, 500, 2000, 5000):
+        payloads = [
+            json.dumps(make_next_data(f"geek{i}", solved, 365, seed=i)).encode()
+            for i in range(args.profiles)
+        ]
+        raw, _ = retained(json.loads, payloads)
+        model, held = retained(lambda payload: Profile.from_next_data(json.loads(payload)), payloads)
+        size = sum(map(len, payloads)) / len(payloads)
+        print(
+            f"{solved:>7} {size / 1024:>9.1f} {raw / 1024:>13.1f} "
+            f"{model / 1024:>12.1f} {raw / model:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
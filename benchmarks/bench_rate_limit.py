@@ -0,0 +1,89 @@
+"""Rate limiter throughput with many distinct client IPs.
+
+Usage: python benchmarks/bench_rate_limit.py [--ips N] [--requests N]
+
+Compares the old per-IP timestamp lists with the sliding-window-counter
+limiters (in-process memory and shared SQLite).
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import MemoryRateLimiter, SQLiteRateLimiter  # noqa: E402
+
+WINDOW = 60
+
+
+class LegacyRateLimiter:
+    """The previous utils.is_rate_limited implementation, minus logging"""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.storage = {}
+
+    def hit(self, key, cost=1):
+        now = time.time()
+        if key not in self.storage:
+            self.storage[key] = []
+        self.storage[key] = [ts for ts in self.storage[key] if ts > now - self.window]
+        if len(self.storage[key]) + cost > self.limit:
+            return True
+        self.storage[key].extend([now] * cost)
+        if now % 300 < 1:
+            self.storage = {k: v for k, v in self.storage.items() if v}
+        return False
+
+    def __len__(self):
+        return len(self.storage)
+
+
+def workload(ips, requests, seed=0):
+    # 80% of traffic from 1% of clients, the rest spread over everyone
+    rng = random.Random(seed)
+    hot = max(1, ips // 100)
+    return [
+        f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+        for n in (
+            rng.randrange(hot) if rng.random() < 0.8 else rng.randrange(ips)
+            for _ in range(requests)
+        )
+    ]
+
+
+def run(name, limiter, keys):
+    started = time.perf_counter()
+    rejected = sum(1 for key in keys if limiter.hit(key))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<10} {len(keys) / elapsed:>12,.0f} req/s "
+        f"{elapsed / len(keys) * 1e6:>8.2f} us/req "
+        f"{rejected:>9,} rejected {len(limiter):>9,} keys held"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ips", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=300000)
+    parser.add_argument("--limit", type=int, default=10, help="requests per window")
+    args = parser.parse_args()
+
+    keys = workload(args.ips, args.requests)
+    print(f"{args.requests:,} requests from up to {args.ips:,} IPs, limit {args.limit}/{WINDOW}s")
+
+    run("legacy", LegacyRateLimiter(args.limit, WINDOW), keys)
+    run("memory", MemoryRateLimiter(args.limit, WINDOW), keys)
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_keys = keys[: max(1, len(keys) // 10)]
+        limiter = SQLiteRateLimiter(os.path.join(directory, "rl.db"), args.limit, WINDOW)
+        run("sqlite", limiter, sqlite_keys)
+
+
+if __name__ == "__main__":
+    main()
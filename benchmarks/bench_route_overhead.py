@@ -0,0 +1,81 @@
+"""Time the Flask route layer per request with the scraper stubbed out.
+
+Usage: python benchmarks/bench_route_overhead.py [--requests N] [--rounds N] [--log-level LEVEL]
+
+The scraper returns a prebuilt Profile and requests are fed straight to
+the WSGI callable, so the figures are validation, rate limiting, logging,
+caching headers and response building plus Flask's own dispatch. "bare"
+is a route that returns a constant, the floor set by Flask and the app's
+before/after request hooks; "invalid" is a rejected username.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+
+from werkzeug.test import EnvironBuilder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_pages import make_next_data  # noqa: E402
+
+PATHS = {
+    "bare": "/__bench_bare",
+    "invalid": "/api/coding-stats?username=no!",
+    "coding_stats": "/api/coding-stats?username=bench_user",
+    "streak": "/api/streak?username=bench_user",
+    "profile": "/api/profile?username=bench_user",
+    "profile_304": "/api/profile?username=bench_user",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5, help="the best round is reported")
+    parser.add_argument("--log-level", default="INFO",
+                        help="LOG_LEVEL for the app (DEBUG shows the cost of debug logging)")
+    args = parser.parse_args()
+
+    os.environ["LOG_LEVEL"] = args.log_level
+    os.environ.setdefault("RATE_LIMIT_MAX_REQUESTS", str(10 ** 9))
+    import app as app_module
+    from profile_model import Profile
+
+    # Debug records are formatted but go nowhere, as with a quiet handler
+    for handler in logging.getLogger().handlers:
+        handler.setLevel(logging.CRITICAL)
+
+    profile = Profile.from_next_data(make_next_data(solved=200))
+    app_module.scraper.get_profile = lambda username: profile
+    app_module.app.add_url_rule("/__bench_bare", "bench_bare", lambda: "ok")
+    wsgi_app = app_module.app
+    etag = wsgi_app.test_client().get(PATHS["profile"]).headers["ETag"]
+
+    def start_response(status, headers, exc_info=None):
+        pass
+
+    def request(environ):
+        body = wsgi_app(dict(environ), start_response)
+        for _ in body:
+            pass
+        if hasattr(body, "close"):
+            body.close()
+
+    print(f"log level {args.log_level}, best of {args.rounds} x {args.requests} requests")
+    for name, path in PATHS.items():
+        headers = {"If-None-Match": etag} if name == "profile_304" else {}
+        environ = EnvironBuilder(path=path, headers=headers).get_environ()
+        request(environ)
+        best = float("inf")
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                request(environ)
+            best = min(best, time.perf_counter() - started)
+        print(f"{name:<14} {best / args.requests * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
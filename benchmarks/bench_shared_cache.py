@@ -0,0 +1,115 @@
+"""Compare per-worker profile caches with one SharedProfileCache across worker processes.
+
+Usage: python benchmarks/bench_shared_cache.py [--workers N] [--users N] [--requests N]
+                                               [--latency MS] [--solved N]
+
+Each worker process runs its own scraper against an in-process stub server,
+as gunicorn sync workers would, and looks up ``--requests`` usernames drawn
+at random from ``--users``. "per-worker" gives every scraper its own
+ProfileCache; "shared" points them all at one SQLite database. Reported:
+hit rate over all lookups, requests that reached the stub, wall time, and
+each worker's resident memory at the end of its run.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import multiprocessing
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+os.environ.setdefault("UPSTREAM_RATE", str(10 ** 6))
+os.environ.setdefault("UPSTREAM_BURST", str(10 ** 6))
+
+from stub_server import StubOptions, start_stub_server  # noqa: E402
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, in KiB on Linux
+
+
+def worker(seed, base_url, shared_path, users, requests, results):
+    from cache import ProfileCache
+    from shared_cache import SharedProfileCache
+    from scraper import GeeksforGeeksScraper
+
+    if shared_path:
+        cache = SharedProfileCache(shared_path)
+    else:
+        cache = ProfileCache()
+    scraper = GeeksforGeeksScraper(cache=cache)
+    scraper.BASE_URL = base_url
+    fetches = []
+    scraper.add_listener(lambda username, profile: fetches.append(username))
+
+    rng = random.Random(seed)
+    for _ in range(requests):
+        scraper.get_profile(f"user_{rng.randrange(users)}")
+    results.put((requests, len(fetches), rss_mb()))
+
+
+def run(mode, args, base_url, server):
+    shared_path = None
+    if mode == "shared":
+        shared_path = os.path.join(tempfile.mkdtemp(prefix="gfg-shared-"), "cache.db")
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    before = server.requests
+    started = time.perf_counter()
+    processes = [
+        context.Process(
+            target=worker,
+            args=(seed, base_url, shared_path, args.users, args.requests, results),
+        )
+        for seed in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    lookups = sum(outcome[0] for outcome in outcomes)
+    fetches = sum(outcome[1] for outcome in outcomes)
+    rss = [outcome[2] for outcome in outcomes]
+    print(
+        f"{mode:<11} hit rate {1 - fetches / lookups:6.1%}  "
+        f"upstream {server.requests - before:5d}  {elapsed:6.2f}s  "
+        f"RSS/worker {sum(rss) / len(rss):6.1f} MB (max {max(rss):.1f})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=600, help="lookups per worker")
+    parser.add_argument("--latency", type=float, default=20.0, help="stub latency (ms)")
+    parser.add_argument("--solved", type=int, default=500, help="solved problems per profile")
+    args = parser.parse_args()
+
+    server = start_stub_server(options=StubOptions(solved=args.solved, latency=args.latency / 1000))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/user/"
+
+    print(f"{args.workers} workers x {args.requests} lookups over {args.users} users")
+    for mode in ("per-worker", "shared"):
+        run(mode, args, base_url, server)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
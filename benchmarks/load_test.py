@@ -0,0 +1,208 @@
+"""Drive the Flask app under concurrent load against the local stub server.
+
+Usage: python benchmarks/load_test.py [--concurrency N] [--requests N] [--users N]
+                                      [--endpoints a,b] [--no-cache] [--tracemalloc]
+                                      [--accept-encoding E] [--json FILE]
+                                      [stub options, see stub_server.py]
+
+The stub runs in a subprocess so the memory figures describe only the app.
+The app runs in this process on a threaded werkzeug server. For each endpoint
+the report shows throughput, p50/p95/p99 latency, error count, RSS growth
+and, with --tracemalloc, peak Python allocations. KiB/resp is the size on
+the wire, so it shrinks when --accept-encoding lets the app compress.
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import subprocess
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from stub_server import add_stub_arguments  # noqa: E402
+
+ENDPOINTS = {
+    "profile": ("GET", "/api/profile?username={username}"),
+    "profile_fields": ("GET", "/api/profile?username={username}&fields=info.fullname,solved_stats"),
+    "profile_stream": ("GET", "/api/profile?username={username}&stream=ndjson"),
+    "basic_info": ("GET", "/api/basic-info?username={username}"),
+    "coding_stats": ("GET", "/api/coding-stats?username={username}"),
+    "submission_data": ("GET", "/api/submission-data?username={username}"),
+    "difficulty_stats": ("GET", "/api/difficulty-stats?username={username}"),
+    "institution_languages": ("GET", "/api/institution-languages?username={username}"),
+    "streak": ("GET", "/api/streak?username={username}"),
+    "batch": ("POST", "/api/profiles/batch"),
+}
+BATCH_SIZE = 10
+
+
+def start_stub(args):
+    command = [
+        sys.executable, os.path.join(BENCH_DIR, "stub_server.py"), "--port", "0",
+        "--solved", str(args.solved), "--heatmap-days", str(args.heatmap_days),
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate), "--throttle-rate", str(args.throttle_rate),
+        "--missing-rate", str(args.missing_rate),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    port = int(process.stdout.readline().split()[-1])
+    return process, port
+
+
+def start_app(stub_port, no_cache):
+    # The scraper reads its configuration at import time
+    os.environ["GFG_BASE_URL"] = f"http://127.0.0.1:{stub_port}/user/"
+    os.environ.setdefault("RATE_LIMIT_MAX_REQUESTS", str(10 ** 9))
+    os.environ.setdefault("UPSTREAM_RATE", "0")
+    if no_cache:
+        os.environ["PROFILE_CACHE_TTL"] = "0"
+
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="app", daemon=True).start()
+    return server
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_endpoint(base_url, name, args):
+    method, path = ENDPOINTS[name]
+    users = [f"bench_user_{i}" for i in range(args.users)]
+    local = threading.local()
+
+    def one_request(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+            session.headers["Accept-Encoding"] = args.accept_encoding
+        rng = random.Random(i)
+        started = time.perf_counter()
+        if method == "POST":
+            payload = {"usernames": rng.sample(users, min(BATCH_SIZE, len(users)))}
+            response = session.post(base_url + path, json=payload, stream=True)
+        else:
+            response = session.get(base_url + path.format(username=rng.choice(users)), stream=True)
+        # Wire size; decompressing on the client would skew the app's figures
+        body = response.raw.read()
+        return time.perf_counter() - started, response.status_code, len(body)
+
+    rss_before = rss_bytes()
+    if args.tracemalloc:
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one_request, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _, _ in results)
+    report = {
+        "endpoint": name,
+        "requests": len(results),
+        "errors": sum(1 for _, status, _ in results if status >= 400),
+        "throughput": len(results) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "avg_bytes": sum(size for _, _, size in results) / max(1, len(results)),
+        "rss_growth_mb": (rss_bytes() - rss_before) / 2 ** 20,
+    }
+    if args.tracemalloc:
+        report["traced_peak_mb"] = (tracemalloc.get_traced_memory()[1] - traced_before) / 2 ** 20
+    return report
+
+
+def print_report(reports, show_traced):
+    header = (
+        f"{'endpoint':<22} {'req':>6} {'err':>5} {'req/s':>8} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'KiB/resp':>9} {'RSS +MiB':>9}"
+    )
+    if show_traced:
+        header += f" {'peak MiB':>9}"
+    print(header)
+    for r in reports:
+        line = (
+            f"{r['endpoint']:<22} {r['requests']:>6} {r['errors']:>5} {r['throughput']:>8.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+            f"{r['avg_bytes'] / 1024:>9.1f} {r['rss_growth_mb']:>9.1f}"
+        )
+        if show_traced:
+            line += f" {r['traced_peak_mb']:>9.1f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--users", type=int, default=200, help="distinct usernames to draw from")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help="comma-separated subset of: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--no-cache", action="store_true", help="disable the in-process profile cache")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also report peak Python allocations (slows the app down)")
+    parser.add_argument("--accept-encoding", default="identity",
+                        help="Accept-Encoding sent with every request, e.g. 'gzip' or 'br'")
+    parser.add_argument("--json", help="write the report to this file for later comparison")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    stub, stub_port = start_stub(args)
+    try:
+        server = start_app(stub_port, args.no_cache)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        if args.tracemalloc:
+            tracemalloc.start()
+
+        print(
+            f"concurrency={args.concurrency} requests={args.requests} users={args.users} "
+            f"solved={args.solved} latency={args.latency}ms cache={'off' if args.no_cache else 'on'} "
+            f"accept-encoding={args.accept_encoding}"
+        )
+        reports = [run_endpoint(base_url, name, args) for name in endpoints]
+        print_report(reports, args.tracemalloc)
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"args": vars(args), "results": reports}, f, indent=2)
+        server.shutdown()
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Synthetic GeeksforGeeks profile pages for offline benchmarks.
+
+Pages mirror the structure the scraper reads from ``__NEXT_DATA__``; sizes are
+driven by the number of solved problems and heatmap days.
+"""
+import os
+import json
+import random
+import datetime
+
+DIFFICULTIES = ("School", "Basic", "Easy", "Medium", "Hard")
+LANGUAGES = ("c++", "java", "python", "javascript", "c")
+
+
+def make_next_data(username="geek123", solved=500, heatmap_days=365, seed=0, today=None):
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+
+    submissions = {difficulty: {} for difficulty in DIFFICULTIES}
+    for i in range(solved):
+        difficulty = DIFFICULTIES[rng.randrange(len(DIFFICULTIES))]
+        slug = f"problem-{i}-{rng.randrange(10 ** 6)}"
+        submissions[difficulty][str(700000 + i)] = {
+            "slug": slug,
+            "pname": slug.replace("-", " ").title(),
+            "lang": rng.choice(LANGUAGES),
+        }
+
+    heatmap = {}
+    for day in range(heatmap_days):
+        if rng.random() < 0.6:
+            date = today - datetime.timedelta(days=day)
+            heatmap[date.isoformat()] = rng.randint(1, 8)
+
+    return {
+        "props": {
+            "pageProps": {
+                "userInfo": {
+                    "name": username.title(),
+                    "created_date": "2021-06-01 10:00:00",
+                    "institute_name": rng.choice(["IIT Delhi", "NIT Trichy", "BITS Pilani"]),
+                    "score": solved * 3,
+                    "monthly_score": rng.randint(0, 200),
+                    "total_problems_solved": solved,
+                    "pod_solved_longest_streak": rng.randint(0, 120),
+                },
+                "contestData": {
+                    "user_global_rank": rng.randint(1, 100000),
+                    "user_contest_data": {"current_rating": rng.randint(900, 2500)},
+                },
+                "userSubmissionsInfo": submissions,
+                "heatMapData": {"result": heatmap},
+                "languages": ", ".join(rng.sample(LANGUAGES, 3)),
+            }
+        },
+        "page": "/user/[userName]",
+        "query": {"userName": username},
+        "buildId": "benchmark-build",
+    }
+
+
+def make_page(username="geek123", solved=500, heatmap_days=365, seed=0, missing=False):
+    """Return a full profile page as bytes"""
+    markup = "".join(
+        f'<div class="dashboard_card__{i}"><span>Card {i}</span></div>' for i in range(2000)
+    )
+    if missing:
+        markup = "<h1>Profile does not exist</h1>" + markup
+    next_data = json.dumps(
+        make_next_data(username, solved, heatmap_days, seed), separators=(",", ":")
+    )
+    page = (
+        "<!DOCTYPE html><html><head><title>Profile</title></head><body>"
+        f'<div id="__next">{markup}</div>'
+        f'<script id="__NEXT_DATA__" type="application/json">{next_data}</script>'
+        '<script src="/_next/static/chunks/main.js" async=""></script>'
+        "</body></html>"
+    )
+    return page.encode("utf-8")
+
+
+def load_saved_pages(directory):
+    """Load saved pages (``*.html``) captured from the live site, if any"""
+    pages = {}
+    if directory and os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".html"):
+                with open(os.path.join(directory, name), "rb") as f:
+                    pages[name] = f.read()
+    return pages
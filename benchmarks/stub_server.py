@@ -0,0 +1,155 @@
+"""Local stand-in for www.geeksforgeeks.org serving synthetic profile pages.
+
+Usage: python benchmarks/stub_server.py [--port N] [--solved N] [--heatmap-days N]
+                                        [--latency MS] [--jitter MS]
+                                        [--error-rate P] [--throttle-rate P] [--missing-rate P]
+
+Serves ``/user/<username>/`` pages built by sample_pages.make_page. Each
+username always gets the same page (seeded by the name). Point the scraper at
+it with ``GFG_BASE_URL=http://127.0.0.1:<port>/user/``. The first line
+printed is ``listening on <port>``.
+"""
+import os
+import sys
+import time
+import random
+import zlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sample_pages import make_page  # noqa: E402
+
+
+class StubOptions:
+
+    def __init__(self, solved=500, heatmap_days=365, latency=0.0, jitter=0.0,
+                 error_rate=0.0, throttle_rate=0.0, missing_rate=0.0):
+        self.solved = solved
+        self.heatmap_days = heatmap_days
+        self.latency = latency  # seconds
+        self.jitter = jitter  # seconds
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.missing_rate = missing_rate
+
+
+class StubServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, options):
+        super().__init__(address, StubHandler)
+        self.options = options
+        self.pages = {}
+        self.pages_lock = threading.Lock()
+        self.requests = 0
+
+    def handle_error(self, request, client_address):
+        # Clients close the connection once they have read what they need
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def page_for(self, username):
+        page = self.pages.get(username)
+        if page is None:
+            options = self.options
+            seed = zlib.crc32(username.encode())
+            missing = random.Random(seed).random() < options.missing_rate
+            page = make_page(username, options.solved, options.heatmap_days, seed, missing)
+            with self.pages_lock:
+                self.pages[username] = page
+        return page
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        options = server.options
+        server.requests += 1
+
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if len(parts) != 2 or parts[0] != "user":
+            self._send(404, b"Not Found", "text/plain")
+            return
+
+        delay = options.latency + random.uniform(0, options.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < options.error_rate:
+            self._send(503, b"Service Unavailable", "text/plain")
+        elif roll < options.error_rate + options.throttle_rate:
+            self._send(429, b"Too Many Requests", "text/plain", {"Retry-After": "1"})
+        else:
+            self._send(200, server.page_for(parts[1]), "text/html; charset=utf-8")
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, options=None):
+    """Start a stub server on a background thread; returns the server"""
+    server = StubServer(("127.0.0.1", port), options or StubOptions())
+    thread = threading.Thread(target=server.serve_forever, name="gfg-stub", daemon=True)
+    thread.start()
+    return server
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--solved", type=int, default=500, help="solved problems per profile")
+    parser.add_argument("--heatmap-days", type=int, default=365)
+    parser.add_argument("--latency", type=float, default=50.0, help="base upstream latency (ms)")
+    parser.add_argument("--jitter", type=float, default=20.0, help="extra random latency (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction answered 429")
+    parser.add_argument("--missing-rate", type=float, default=0.0,
+                        help="fraction of usernames whose profile does not exist")
+
+
+def stub_options_from_args(args):
+    return StubOptions(
+        solved=args.solved,
+        heatmap_days=args.heatmap_days,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        missing_rate=args.missing_rate,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", args.port), stub_options_from_args(args))
+    print(f"listening on {server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
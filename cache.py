@@ -0,0 +1,159 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", 300))  # seconds
+# Past PROFILE_CACHE_TTL, entries may still be served while a refresh runs in
+# the background, until this hard limit. Defaults to no stale serving.
+PROFILE_CACHE_STALE_TTL = float(os.getenv("PROFILE_CACHE_STALE_TTL", PROFILE_CACHE_TTL))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", 1024))
+PROFILE_CACHE_MAX_BYTES = int(os.getenv("PROFILE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+class _CacheEntry:
+
+    __slots__ = ("value", "size", "stored_at")
+
+    def __init__(self, value, size, stored_at):
+        self.value = value
+        self.size = size
+        self.stored_at = stored_at
+
+
+class ProfileCache:
+    """Thread-safe TTL + LRU cache for parsed profile data, keyed by username.
+
+    Entries are fresh for ``ttl`` seconds. If ``stale_ttl`` is larger, they are
+    kept until then so ``lookup`` can serve them as stale while the caller
+    refreshes them (stale-while-revalidate).
+    """
+
+    def __init__(
+        self,
+        ttl=PROFILE_CACHE_TTL,
+        stale_ttl=None,
+        max_entries=PROFILE_CACHE_MAX_ENTRIES,
+        max_bytes=PROFILE_CACHE_MAX_BYTES,
+        clock=time.monotonic,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = max(ttl, stale_ttl or 0)  # None disables stale serving
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expired entry"""
+        value, stale = self.lookup(key, allow_stale=False)
+        return value
+
+    def lookup(self, key, allow_stale=True):
+        """Return (value, stale); value is None on a miss.
+
+        ``stale`` is True when the entry is past ``ttl`` but within ``stale_ttl``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            age = self._clock() - entry.stored_at
+            if age > self.stale_ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None, False
+
+            stale = age > self.ttl
+            if stale and not allow_stale:
+                self.misses += 1
+                return None, False
+
+            self._entries.move_to_end(key)
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return entry.value, stale
+
+    def ttl_remaining(self, key):
+        """Seconds until key's entry goes stale (0 if it already is), or None if absent"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return max(0.0, self.ttl - (self._clock() - entry.stored_at))
+
+    def set(self, key, value, size=0, stored_at=None):
+        """Store value under key; size is its approximate footprint in bytes.
+
+        ``stored_at`` (on this cache's clock) backdates an entry copied from
+        another cache, so it expires when the original does.
+        """
+        if self.max_entries <= 0 or (self.max_bytes and size > self.max_bytes):
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if stored_at is None:
+                stored_at = self._clock()
+            self._entries[key] = _CacheEntry(value, size, stored_at)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.stale_hits) / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
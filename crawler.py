@@ -0,0 +1,337 @@
+"""Scheduled refresh of a watch-listed cohort of GeeksforGeeks profiles.
+
+Usage: python crawler.py --watchlist users.txt [--db crawl_queue.db] [--workers N]
+                         [--interval SECONDS] [--prune] [--once]
+
+The watchlist has one username per line, optionally followed by a comma and
+a priority (higher is fetched first); ``#`` starts a comment. Usernames are
+kept in a persistent SQLite queue with their next refresh time, so a
+restarted crawler resumes where it stopped. Fetches go through the normal
+GeeksforGeeksScraper, so they share its upstream token bucket, retries and
+circuit breaker, and land in its profile cache, PROFILE_STORE_PATH store
+and HISTORY_DB_PATH history. An API process pointed at the same store
+(with PROFILE_STORE_MAX_AGE at least the crawl interval) serves crawled
+profiles without scraping.
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from errors import UpstreamBlockedError
+from utils import validate_username
+
+logger = logging.getLogger(__name__)
+
+CRAWL_DB_PATH = os.getenv("CRAWL_DB_PATH", "crawl_queue.db")
+CRAWL_INTERVAL = float(os.getenv("CRAWL_INTERVAL", 4 * 3600))  # seconds between refreshes
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", 8))
+CRAWL_LEASE_SECONDS = float(os.getenv("CRAWL_LEASE_SECONDS", 300))
+CRAWL_RETRY_BASE = float(os.getenv("CRAWL_RETRY_BASE", 60))  # seconds, doubled per failure
+CRAWL_IDLE_SLEEP = float(os.getenv("CRAWL_IDLE_SLEEP", 30))  # max seconds between queue polls
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_queue (
+    username TEXT PRIMARY KEY,
+    priority INTEGER NOT NULL DEFAULT 0,
+    next_refresh REAL NOT NULL,
+    leased_until REAL NOT NULL DEFAULT 0,
+    last_success REAL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+)
+"""
+_INDEX = (
+    "CREATE INDEX IF NOT EXISTS crawl_queue_due "
+    "ON crawl_queue (next_refresh, priority)"
+)
+
+
+def read_watchlist(path):
+    """Return [(username, priority)] from a watchlist file, skipping invalid names"""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            username, _, priority = line.partition(",")
+            username = username.strip()
+            if not validate_username(username):
+                logger.warning("Skipping invalid username on line %s: %s", line_number, username)
+                continue
+            try:
+                entries.append((username, int(priority.strip() or 0)))
+            except ValueError:
+                logger.warning("Invalid priority on line %s, using 0", line_number)
+                entries.append((username, 0))
+    return entries
+
+
+class CrawlQueue:
+    """Persistent queue of usernames with per-user next-refresh times and priorities.
+
+    Workers ``lease`` due usernames; a lease that is never completed (the
+    crawler died) expires after ``lease_seconds`` and the username becomes
+    due again.
+    """
+
+    def __init__(self, path, lease_seconds=CRAWL_LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(_SCHEMA)
+        conn.execute(_INDEX)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, entries, now=None):
+        """Add (username, priority) pairs; new usernames are due immediately"""
+        now = now or time.time()
+        conn = self._connection()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO crawl_queue (username, priority, next_refresh) VALUES (?, ?, ?) "
+                    "ON CONFLICT(username) DO UPDATE SET priority = excluded.priority",
+                    [(username, priority, now) for username, priority in entries],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def prune(self, keep):
+        """Remove every username not in ``keep``; returns how many were removed"""
+        keep = set(keep)
+        conn = self._connection()
+        with self._lock:
+            existing = [row[0] for row in conn.execute("SELECT username FROM crawl_queue")]
+            stale = [(username,) for username in existing if username not in keep]
+            conn.executemany("DELETE FROM crawl_queue WHERE username = ?", stale)
+        return len(stale)
+
+    def lease(self, limit, now=None):
+        """Claim up to ``limit`` due usernames, highest priority and most overdue first"""
+        now = now or time.time()
+        conn = self._connection()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                usernames = [
+                    row[0] for row in conn.execute(
+                        "SELECT username FROM crawl_queue "
+                        "WHERE next_refresh <= ? AND leased_until <= ? "
+                        "ORDER BY priority DESC, next_refresh LIMIT ?",
+                        (now, now, limit),
+                    )
+                ]
+                conn.executemany(
+                    "UPDATE crawl_queue SET leased_until = ? WHERE username = ?",
+                    [(now + self.lease_seconds, username) for username in usernames],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return usernames
+
+    def complete(self, username, next_refresh, now=None):
+        self._connection().execute(
+            "UPDATE crawl_queue SET next_refresh = ?, leased_until = 0, last_success = ?, "
+            "failures = 0, last_error = NULL WHERE username = ?",
+            (next_refresh, now or time.time(), username),
+        )
+
+    def fail(self, username, retry_at, error, count_failure=True):
+        self._connection().execute(
+            "UPDATE crawl_queue SET next_refresh = ?, leased_until = 0, "
+            "failures = failures + ?, last_error = ? WHERE username = ?",
+            (retry_at, 1 if count_failure else 0, error[:500], username),
+        )
+
+    def failures(self, username):
+        row = self._connection().execute(
+            "SELECT failures FROM crawl_queue WHERE username = ?", (username,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def next_due(self):
+        """Earliest time any username becomes due (or its lease expires), or None if empty"""
+        row = self._connection().execute(
+            "SELECT MIN(MAX(next_refresh, leased_until)) FROM crawl_queue"
+        ).fetchone()
+        return row[0]
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM crawl_queue").fetchone()[0]
+
+    def stats(self, now=None):
+        now = now or time.time()
+        conn = self._connection()
+        due, leased, failing = conn.execute(
+            "SELECT "
+            "SUM(next_refresh <= ? AND leased_until <= ?), "
+            "SUM(leased_until > ?), "
+            "SUM(failures > 0) FROM crawl_queue",
+            (now, now, now),
+        ).fetchone()
+        return {
+            "users": len(self),
+            "due": due or 0,
+            "leased": leased or 0,
+            "failing": failing or 0,
+        }
+
+
+class Crawler:
+    """Refresh due usernames from a CrawlQueue through a scraper's worker pool"""
+
+    def __init__(self, scraper, queue, interval=CRAWL_INTERVAL, workers=CRAWL_WORKERS,
+                 retry_base=CRAWL_RETRY_BASE):
+        self.scraper = scraper
+        self.queue = queue
+        self.interval = interval
+        self.workers = workers
+        self.retry_base = retry_base
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gfg-crawl")
+        self._stop = threading.Event()
+        self.refreshed = 0
+        self.failed = 0
+
+    def _next_refresh(self, now):
+        # Jitter spreads a cohort added at once over the interval
+        return now + self.interval * random.uniform(0.9, 1.1)
+
+    def _refresh(self, username):
+        try:
+            self.scraper.refresh_profile(username)
+        except UpstreamBlockedError as e:
+            # Upstream-wide trouble, not this user's fault: retry soon, no failure counted
+            self.queue.fail(username, time.time() + self.retry_base, str(e), count_failure=False)
+            return False
+        except Exception as e:
+            failures = self.queue.failures(username)
+            delay = min(self.interval, self.retry_base * (2 ** failures))
+            self.queue.fail(username, time.time() + delay, str(e))
+            logger.warning("Crawl of %s failed (%s), retrying in %.0fs", username, e, delay)
+            self.failed += 1
+            return False
+
+        now = time.time()
+        self.queue.complete(username, self._next_refresh(now), now)
+        self.refreshed += 1
+        return True
+
+    def run_once(self):
+        """Refresh every currently due username; returns how many were attempted"""
+        attempted = 0
+        while not self._stop.is_set():
+            usernames = self.queue.lease(self.workers * 4)
+            if not usernames:
+                break
+            list(self._executor.map(self._refresh, usernames))
+            attempted += len(usernames)
+        return attempted
+
+    def run(self):
+        """Crawl until stop() is called, sleeping while nothing is due"""
+        while not self._stop.is_set():
+            attempted = self.run_once()
+            if attempted:
+                logger.info(
+                    "Crawled %s profiles (refreshed %s, failed %s so far)",
+                    attempted, self.refreshed, self.failed,
+                )
+            next_due = self.queue.next_due()
+            wait = CRAWL_IDLE_SLEEP if next_due is None else next_due - time.time()
+            self._stop.wait(min(CRAWL_IDLE_SLEEP, max(1.0, wait)))
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        self.stop()
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        stats = self.queue.stats()
+        stats["refreshed"] = self.refreshed
+        stats["failed"] = self.failed
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--watchlist", help="file of usernames to crawl (added to the queue)")
+    parser.add_argument("--db", default=CRAWL_DB_PATH, help="crawl queue database")
+    parser.add_argument("--workers", type=int, default=CRAWL_WORKERS)
+    parser.add_argument("--interval", type=float, default=CRAWL_INTERVAL,
+                        help="seconds between refreshes of each profile")
+    parser.add_argument("--prune", action="store_true",
+                        help="drop queued usernames that are not in the watchlist")
+    parser.add_argument("--once", action="store_true", help="refresh what is due, then exit")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "INFO"))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper())
+    from scraper import GeeksforGeeksScraper
+    from profile_store import ProfileStore
+    from history import create_history_store
+
+    queue = CrawlQueue(args.db)
+    if args.watchlist:
+        entries = read_watchlist(args.watchlist)
+        queue.add(entries)
+        if args.prune:
+            removed = queue.prune(username for username, _ in entries)
+            logger.info("Pruned %s usernames no longer in the watchlist", removed)
+        logger.info("Watchlist has %s usernames; queue has %s", len(entries), len(queue))
+
+    # max_age=0: every crawl revalidates upstream instead of trusting the store
+    store_path = os.getenv("PROFILE_STORE_PATH")
+    store = ProfileStore(store_path, max_age=0) if store_path else None
+    if store is None:
+        logger.warning(
+            "PROFILE_STORE_PATH is not set; crawled profiles only warm this process's cache"
+        )
+    scraper = GeeksforGeeksScraper(store=store)
+    history = create_history_store()
+    if history is not None:
+        scraper.add_listener(history.record)
+
+    crawler = Crawler(scraper, queue, interval=args.interval, workers=args.workers)
+    try:
+        if args.once:
+            crawler.run_once()
+        else:
+            crawler.run()
+    except KeyboardInterrupt:
+        logger.info("Stopping crawler")
+    finally:
+        crawler.shutdown()
+        logger.info("Crawler stats: %s", crawler.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
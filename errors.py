@@ -0,0 +1,38 @@
+"""Typed scraper errors, each carrying the HTTP status the API answers with.
+
+Messages are what clients see in ``{"error": ...}``, so they stay the same
+as the generic exceptions these replace.
+"""
+
+
+class ScraperError(Exception):
+    status_code = 500
+
+
+class ProfileNotFoundError(ScraperError):
+    """The username has no GeeksforGeeks profile"""
+    status_code = 404
+
+
+class ProfileParseError(ScraperError):
+    """The profile page came back but its data could not be found or parsed"""
+    status_code = 502
+
+
+class UpstreamError(ScraperError):
+    """The profile page could not be fetched"""
+    status_code = 502
+
+
+class UpstreamBlockedError(UpstreamError):
+    """Upstream refused us (403/429), or our own throttle or circuit breaker did"""
+    status_code = 503
+
+
+class UpstreamTimeoutError(UpstreamError):
+    status_code = 504
+
+
+def error_status(error):
+    """HTTP status for an exception raised while serving a profile"""
+    return getattr(error, "status_code", 500)
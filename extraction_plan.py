@@ -0,0 +1,81 @@
+from functools import lru_cache
+
+# Every field of the complete profile as
+# (section, field, extractor that produces it, key in that extractor's output)
+PROFILE_FIELDS = (
+    ("info", "username", "user_info", "username"),
+    ("info", "fullname", "user_info", "fullname"),
+    ("info", "qualification", "user_info", "qualification"),
+    ("info", "joined_date", "user_info", "joined_date"),
+    ("info", "institution", "institution_languages", "institution"),
+    ("info", "languages_used", "institution_languages", "languages_used"),
+    ("solved_stats", "coding_score", "coding_stats", "coding_score"),
+    ("solved_stats", "problems_solved", "coding_stats", "problems_solved"),
+    ("solved_stats", "contest_rating", "coding_stats", "contest_rating"),
+    ("solved_stats", "overall_rank", "coding_stats", "overall_rank"),
+    ("solved_stats", "total_submissions", "coding_stats", "problems_solved"),
+    ("solved_stats", "monthly_score", "streak", "monthly_score"),
+    ("solved_stats", "current_streak", "streak", "current_streak"),
+    ("solved_stats", "longest_streak", "streak", "longest_streak"),
+    ("solved_stats", "difficulty_breakdown", "difficulty_stats", "solved_by_difficulty"),
+    ("solved_stats", "problems_by_difficulty", "difficulty_problems", "problems_by_difficulty"),
+)
+
+
+class ExtractionPlan:
+    """The fields of a complete profile to build and the extractors they need"""
+
+    __slots__ = ("fields", "extractors", "_without_problems")
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.extractors = frozenset(extractor for _, _, extractor, _ in fields)
+        self._without_problems = None
+
+    @property
+    def include_problems(self):
+        return "difficulty_problems" in self.extractors
+
+    def without_problems(self):
+        if self._without_problems is None:
+            if self.include_problems:
+                self._without_problems = ExtractionPlan(
+                    tuple(f for f in self.fields if f[2] != "difficulty_problems")
+                )
+            else:
+                self._without_problems = self
+        return self._without_problems
+
+
+FULL_PROFILE_PLAN = ExtractionPlan(PROFILE_FIELDS)
+
+
+@lru_cache(maxsize=256)
+def compile_fields(spec):
+    """Compile a ``fields=`` spec such as ``info.fullname,solved_stats`` into a plan.
+
+    Each comma-separated token names a whole section or ``section.field``.
+    An empty spec selects every field. Raises ValueError for unknown fields.
+    """
+    if not spec:
+        return FULL_PROFILE_PLAN
+
+    selected = set()
+    for token in spec.split(","):
+        token = token.strip()
+        if not token:
+            continue
+
+        matches = [
+            field for field in PROFILE_FIELDS
+            if token == field[0] or token == f"{field[0]}.{field[1]}"
+        ]
+        if not matches:
+            raise ValueError(f"Unknown field '{token}'")
+        selected.update(matches)
+
+    if not selected:
+        return FULL_PROFILE_PLAN
+
+    # Keep the canonical field order regardless of how the spec was written
+    return ExtractionPlan(tuple(field for field in PROFILE_FIELDS if field in selected))
@@ -0,0 +1,160 @@
+import os
+import sys
+from array import array
+from datetime import date
+from functools import lru_cache
+
+# Most days of history kept per profile
+HEATMAP_MAX_DAYS = int(os.getenv("HEATMAP_MAX_DAYS", 3 * 366))
+
+ROLLING_WINDOWS = (7, 30, 365)
+
+
+# Every profile's heatmap covers the same recent dates, so parse each key once
+@lru_cache(maxsize=4096)
+def _parse_day(key):
+    """Return the proleptic ordinal of a ``YYYY-MM-DD...`` key, or None"""
+    try:
+        return date.fromisoformat(key[:10]).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_count(value):
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class Heatmap:
+    """Daily submission counts as one dense array indexed by day ordinal.
+
+    ``counts[i]`` is the number of submissions on ``date.fromordinal(start + i)``.
+    Dates are parsed once, when the profile is fetched; ``stats`` derives
+    every streak and activity figure in one pass and memoises it per day.
+    """
+
+    __slots__ = ("start", "counts", "_stats")
+
+    def __init__(self, start=0, counts=None):
+        self.start = start
+        self.counts = counts if counts is not None else array("I")
+        self._stats = None
+
+    @property
+    def end(self):
+        """Ordinal of the last day covered, or None when empty"""
+        return self.start + len(self.counts) - 1 if self.counts else None
+
+    def __len__(self):
+        return len(self.counts)
+
+    def count(self, day):
+        index = day - self.start
+        if 0 <= index < len(self.counts):
+            return self.counts[index]
+        return 0
+
+    @classmethod
+    def from_result(cls, result, max_days=HEATMAP_MAX_DAYS):
+        """Build a heatmap from upstream ``heatMapData.result``.
+
+        Covers exactly the days upstream returned (the latest ``max_days`` of
+        them), so a refreshed profile matches a cold fetch of the same data.
+        """
+        if not isinstance(result, dict):
+            result = {}
+
+        days = {}
+        for key, value in result.items():
+            day = _parse_day(key)
+            if day is not None:
+                days[day] = days.get(day, 0) + _parse_count(value)
+        if not days:
+            return cls()
+
+        start = min(days)
+        counts = array("I", bytes(4 * (max(days) - start + 1)))
+        for day, count in days.items():
+            counts[day - start] = count
+        return cls(start, counts)._trim(max_days)
+
+    def _trim(self, max_days):
+        excess = len(self.counts) - max_days
+        if max_days > 0 and excess > 0:
+            del self.counts[:excess]
+            self.start += excess
+        return self
+
+    def stats(self, today=None):
+        """Streak and activity figures as of ``today`` (a date, default today).
+
+        Returns current and longest streak (consecutive days with at least one
+        submission; the current streak may end yesterday), active days, total
+        submissions, submissions in the last 7/30/365 days, and submissions
+        per ``YYYY-MM`` month. The result is shared; treat it as read-only.
+        """
+        today = (today or date.today()).toordinal()
+        cached = self._stats
+        if cached is not None and cached[0] == today:
+            return cached[1]
+
+        stats = self._compute(today)
+        self._stats = (today, stats)
+        return stats
+
+    def _compute(self, today):
+        start = self.start
+        counts = self.counts
+        window_starts = [today - days + 1 for days in ROLLING_WINDOWS]
+        rolling = [0] * len(ROLLING_WINDOWS)
+        by_month = {}
+        month_key = None
+        month_end = 0
+
+        active_days = total = longest = run = 0
+        for index, count in enumerate(counts):
+            if not count:
+                run = 0
+                continue
+
+            day = start + index
+            active_days += 1
+            total += count
+            run += 1
+            if run > longest:
+                longest = run
+
+            if day > month_end:
+                current = date.fromordinal(day)
+                month_key = f"{current.year:04d}-{current.month:02d}"
+                next_month = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+                month_end = next_month.toordinal() - 1
+            by_month[month_key] = by_month.get(month_key, 0) + count
+
+            if day <= today:
+                for i, window_start in enumerate(window_starts):
+                    if day >= window_start:
+                        rolling[i] += count
+
+        # A streak is still current if the user has not submitted yet today
+        day = today if self.count(today) else today - 1
+        current_streak = 0
+        while self.count(day):
+            current_streak += 1
+            day -= 1
+
+        stats = {
+            "current_streak": current_streak,
+            "longest_streak": longest,
+            "active_days": active_days,
+            "total_submissions": total,
+            "submissions_by_month": by_month,
+        }
+        for days, value in zip(ROLLING_WINDOWS, rolling):
+            stats[f"last_{days}_days"] = value
+        return stats
+
+    def approx_size(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.counts)
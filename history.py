@@ -0,0 +1,264 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+
+from profile_model import DIFFICULTIES, PROBLEM_URL
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MAX_SNAPSHOTS = int(os.getenv("HISTORY_MAX_SNAPSHOTS", 500))  # per response
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        username TEXT NOT NULL,
+        taken_at REAL NOT NULL,
+        counters TEXT NOT NULL,
+        solved TEXT,
+        PRIMARY KEY (username, taken_at)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS latest (
+        username TEXT PRIMARY KEY,
+        checked_at REAL NOT NULL,
+        counters TEXT NOT NULL,
+        solved TEXT NOT NULL
+    )
+    """,
+)
+
+
+def snapshot_counters(profile):
+    """The numbers tracked over time for a profile, as a flat dict"""
+    activity = profile.heatmap.stats()
+    counters = {
+        "coding_score": profile.score,
+        "problems_solved": profile.problems_solved,
+        "monthly_score": profile.monthly_score,
+        "contest_rating": profile.contest_rating,
+        "overall_rank": profile.overall_rank,
+        "longest_streak": profile.longest_streak,
+        "current_streak": activity["current_streak"],
+    }
+    for (difficulty, key), count in zip(DIFFICULTIES, profile.solved_counts):
+        counters[f"solved_{key}"] = count
+    return counters
+
+
+def parse_since(value):
+    """Parse a ``since`` parameter (epoch seconds or ISO 8601) into epoch seconds.
+
+    Returns None for an empty value; raises ValueError if it cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid since parameter '{value}'")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _problems_json(new_problems):
+    return [
+        {"difficulty": key, "name": name, "url": PROBLEM_URL + slug + "/0"}
+        for key, name, slug in new_problems
+    ]
+
+
+class HistoryStore:
+    """Delta-encoded time series of profile snapshots in SQLite.
+
+    Each username has one ``latest`` row holding its full counters and solved
+    set. A ``snapshots`` row is written only when something changed, and it
+    holds just the changed counters and newly solved problems. The first
+    snapshot holds every counter. Storage therefore grows with activity,
+    not with how often or how large profiles are polled.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self.recorded = 0
+        self.unchanged = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        for statement in _SCHEMA:
+            conn.execute(statement)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def record(self, username, profile, taken_at=None):
+        """Record a freshly fetched profile; returns True if a snapshot was written"""
+        taken_at = taken_at or time.time()
+        counters = snapshot_counters(profile)
+        solved = {
+            slug: [key, name] for key, name, slug in profile.iter_problems()
+        }
+
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT counters, solved FROM latest WHERE username = ?", (username,)
+                ).fetchone()
+
+                if row is None:
+                    changed = counters
+                    new_problems = [
+                        (key, name, slug) for slug, (key, name) in solved.items()
+                    ]
+                else:
+                    previous = json.loads(row[0])
+                    previous_solved = set(json.loads(row[1]))
+                    changed = {
+                        name: value for name, value in counters.items()
+                        if previous.get(name) != value
+                    }
+                    new_problems = [
+                        (key, name, slug) for slug, (key, name) in solved.items()
+                        if slug not in previous_solved
+                    ]
+
+                wrote = bool(changed or new_problems)
+                if wrote:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO snapshots (username, taken_at, counters, solved) "
+                        "VALUES (?, ?, ?, ?)",
+                        (
+                            username,
+                            taken_at,
+                            json.dumps(changed, separators=(",", ":")),
+                            json.dumps(new_problems, separators=(",", ":")) if new_problems else None,
+                        ),
+                    )
+                if row is None or new_problems:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO latest (username, checked_at, counters, solved) "
+                        "VALUES (?, ?, ?, ?)",
+                        (
+                            username,
+                            taken_at,
+                            json.dumps(counters, separators=(",", ":")),
+                            json.dumps(list(solved), separators=(",", ":")),
+                        ),
+                    )
+                else:
+                    # The solved set is unchanged; avoid rewriting it
+                    conn.execute(
+                        "UPDATE latest SET checked_at = ?, counters = ? WHERE username = ?",
+                        (taken_at, json.dumps(counters, separators=(",", ":")), username),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        if wrote:
+            self.recorded += 1
+        else:
+            self.unchanged += 1
+        return wrote
+
+    def _snapshots(self, username, since=None, limit=None):
+        query = "SELECT taken_at, counters, solved FROM snapshots WHERE username = ?"
+        params = [username]
+        if since is not None:
+            query += " AND taken_at > ?"
+            params.append(since)
+        query += " ORDER BY taken_at"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self._connection().execute(query, params).fetchall()
+
+    def history(self, username, since=None, limit=HISTORY_MAX_SNAPSHOTS):
+        """Snapshots after ``since`` (epoch seconds), oldest first, changes only"""
+        return [
+            {
+                "taken_at": _isoformat(taken_at),
+                "changes": json.loads(counters),
+                "new_problems": _problems_json(json.loads(solved)) if solved else [],
+            }
+            for taken_at, counters, solved in self._snapshots(username, since, limit)
+        ]
+
+    def delta(self, username, since=None):
+        """Net change since ``since``, or since the snapshot before the latest.
+
+        Returns None if the user has never been recorded. Counters are
+        reported as ``{"from": old, "to": new}`` and only if they differ.
+        """
+        rows = self._snapshots(username)
+        if not rows:
+            return None
+
+        if since is None:
+            since = rows[-2][0] if len(rows) > 1 else rows[0][0] - 1
+
+        before = {}
+        after = {}
+        new_problems = []
+        for taken_at, counters, solved in rows:
+            counters = json.loads(counters)
+            if taken_at <= since:
+                before.update(counters)
+            else:
+                after.update(counters)
+                if solved:
+                    new_problems.extend(json.loads(solved))
+
+        changes = {
+            name: {"from": before.get(name), "to": value}
+            for name, value in after.items()
+            if before.get(name) != value
+        }
+        return {
+            "since": _isoformat(since),
+            "until": _isoformat(rows[-1][0]),
+            "changes": changes,
+            "new_problems": _problems_json(new_problems),
+        }
+
+    def stats(self):
+        conn = self._connection()
+        return {
+            "users": conn.execute("SELECT COUNT(*) FROM latest").fetchone()[0],
+            "snapshots": conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0],
+            "recorded": self.recorded,
+            "unchanged": self.unchanged,
+        }
+
+
+def create_history_store():
+    """HistoryStore at HISTORY_DB_PATH, or None when history is disabled"""
+    path = os.getenv("HISTORY_DB_PATH")
+    return HistoryStore(path) if path else None
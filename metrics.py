@@ -0,0 +1,305 @@
+"""Minimal Prometheus-style metrics: counters, gauges and histograms.
+
+Recording a sample is a lock, a bisect and an add, cheap enough to leave on in
+production. Metrics are per process: with several gunicorn workers each
+worker reports its own values.
+"""
+import time
+import bisect
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self.labels()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return self.labels()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _Value:
+
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    def render(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self._value)}"]
+
+
+class Counter(_Metric):
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set(self, value):
+        self._default().set(value)
+
+
+class _HistogramValue:
+
+    __slots__ = ("_buckets", "_counts", "_sum", "_lock")
+
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def render(self, name, labelnames, key):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self._buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(labelnames, key, [("le", _format_value(float(bound)))])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, key)
+        lines.append(f"{name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def register_collector(self, prefix, stats_fn):
+        """Expose a ``stats()``-style dict as gauges named ``{prefix}_{key}``.
+
+        Nested dicts extend the name; string values become a ``value`` label
+        on a gauge set to 1 (e.g. circuit breaker state).
+        """
+        with self._lock:
+            self._collectors.append((prefix, stats_fn))
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.extend(metric.render())
+        for prefix, stats_fn in collectors:
+            stats = stats_fn()
+            if stats:
+                lines.extend(_render_stats(prefix, stats))
+        return "\n".join(lines) + "\n"
+
+
+def _render_stats(prefix, stats):
+    lines = []
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            lines.extend(_render_stats(name, value))
+        elif isinstance(value, bool):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {int(value)}")
+        elif isinstance(value, (int, float)):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        elif isinstance(value, str):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_format_labels(('value',), (value,))} 1")
+    return lines
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_DURATION = Histogram(
+    "gfg_stage_duration_seconds",
+    "Time spent in each stage of serving a profile",
+    ["stage"],
+)
+UPSTREAM_RESPONSES = Counter(
+    "gfg_upstream_responses_total",
+    "Upstream GeeksforGeeks responses by HTTP status (or 'error')",
+    ["status"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "gfg_rate_limit_rejections_total",
+    "Requests rejected by the per-client rate limiter",
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "gfg_http_requests_in_flight",
+    "API requests currently being served",
+)
+HTTP_REQUESTS = Counter(
+    "gfg_http_requests_total",
+    "API requests by endpoint and response status",
+    ["endpoint", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "gfg_http_request_duration_seconds",
+    "API request latency by endpoint",
+    ["endpoint"],
+)
+
+
+def stage_timer(stage):
+    """Context manager timing one stage into gfg_stage_duration_seconds"""
+    return STAGE_DURATION.labels(stage=stage).time()
+
+
+def timed_stage(stage):
+    """Decorator form of stage_timer"""
+    child = STAGE_DURATION.labels(stage=stage)
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - started)
+        return wrapper
+
+    return decorator
+
+
+def register_service_collectors(scraper, rate_limiter, registry=None):
+    """Expose the scraper's and rate limiter's stats() on /metrics"""
+    registry = registry if registry is not None else REGISTRY
+    if scraper.cache is not None:
+        registry.register_collector("gfg_profile_cache", scraper.cache.stats)
+    registry.register_collector("gfg_singleflight", scraper.singleflight.stats)
+    if scraper.store is not None:
+        registry.register_collector("gfg_profile_store", scraper.store.stats)
+    if scraper.refresher is not None:
+        registry.register_collector("gfg_refresher", scraper.refresher.stats)
+    if scraper.negative_cache is not None:
+        registry.register_collector("gfg_negative_cache", scraper.negative_cache.stats)
+    registry.register_collector("gfg_rate_limiter", rate_limiter.stats)
+    registry.register_collector("gfg_upstream", scraper.upstream.stats)
@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import hashlib
+import threading
+
+from cache import ProfileCache
+
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", 600))  # seconds
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", 100000))
+# Bits per Bloom filter generation; 0 disables the Bloom filter tier
+NEGATIVE_BLOOM_BITS = int(os.getenv("NEGATIVE_BLOOM_BITS", 0))
+NEGATIVE_BLOOM_HASHES = int(os.getenv("NEGATIVE_BLOOM_HASHES", 7))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing of one blake2b digest"""
+
+    __slots__ = ("bits", "hashes", "_array", "count")
+
+    def __init__(self, bits, hashes=NEGATIVE_BLOOM_HASHES):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+        self.count = 0
+
+    def positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, value):
+        array = self._array
+        for position in self.positions(value):
+            array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def has_positions(self, positions):
+        """Membership test for precomputed positions (filters of the same shape share them)"""
+        array = self._array
+        return all(array[position >> 3] & (1 << (position & 7)) for position in positions)
+
+    def __contains__(self, value):
+        return self.has_positions(self.positions(value))
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self._array.__sizeof__()
+
+
+class NegativeCache:
+    """Usernames recently found not to exist, answered without going upstream.
+
+    Exact entries live in a TTL + LRU ProfileCache. With ``bloom_bits`` set,
+    names are also added to a Bloom filter so that they are remembered,
+    in fixed memory, after the LRU has evicted them (e.g. under a scan of
+    random usernames). The filter has two generations, swapped every
+    ``ttl`` seconds, so a name is forgotten 1-2 TTLs after its last miss.
+    A Bloom false positive answers 404 for an existing profile that has
+    never been fetched, so size ``bloom_bits`` for a low error rate (about
+    10 bits per expected name gives ~1% with 7 hashes).
+    """
+
+    def __init__(self, ttl=NEGATIVE_CACHE_TTL, max_entries=NEGATIVE_CACHE_MAX_ENTRIES,
+                 bloom_bits=NEGATIVE_BLOOM_BITS, bloom_hashes=NEGATIVE_BLOOM_HASHES,
+                 clock=time.monotonic):
+        self.ttl = ttl
+        self._exact = ProfileCache(ttl=ttl, max_entries=max_entries, max_bytes=0, clock=clock)
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._generations = None
+        self._rotated_at = clock()
+        if bloom_bits > 0:
+            self._generations = [BloomFilter(bloom_bits, bloom_hashes) for _ in range(2)]
+        self.hits = 0
+        self.bloom_hits = 0
+
+    def _rotate(self):
+        # Caller holds self._lock
+        now = self._clock()
+        if now - self._rotated_at >= self.ttl:
+            self._generations = [
+                BloomFilter(self.bloom_bits, self.bloom_hashes), self._generations[0]
+            ]
+            self._rotated_at = now
+
+    def add(self, username):
+        self._exact.set(username, True)
+        if self._generations is not None:
+            with self._lock:
+                self._rotate()
+                self._generations[0].add(username)
+
+    def discard(self, username):
+        """Forget username (it exists after all); Bloom entries age out on their own"""
+        self._exact.delete(username)
+
+    def __contains__(self, username):
+        if self._exact.get(username) is not None:
+            self.hits += 1
+            return True
+        if self._generations is None:
+            return False
+        with self._lock:
+            self._rotate()
+            generations = self._generations
+        positions = generations[0].positions(username)
+        if any(generation.has_positions(positions) for generation in generations):
+            self.bloom_hits += 1
+            return True
+        return False
+
+    def clear(self):
+        self._exact.clear()
+        if self._generations is not None:
+            with self._lock:
+                self._generations = [
+                    BloomFilter(self.bloom_bits, self.bloom_hashes) for _ in range(2)
+                ]
+
+    def stats(self):
+        stats = {
+            "entries": len(self._exact),
+            "hits": self.hits,
+            "ttl": self.ttl,
+        }
+        if self._generations is not None:
+            stats["bloom_hits"] = self.bloom_hits
+            stats["bloom_names"] = sum(generation.count for generation in self._generations)
+            stats["bloom_bytes"] = sum(map(sys.getsizeof, self._generations))
+        return stats
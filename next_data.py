@@ -0,0 +1,85 @@
+NEXT_DATA_OPEN = b'<script id="__NEXT_DATA__" type="application/json">'
+NEXT_DATA_CLOSE = b"</script>"
+PROFILE_MISSING_MARKER = b"Profile does not exist"
+NEXT_DATA_CHUNK_SIZE = 64 * 1024
+
+
+class NextDataReader:
+    """Incrementally locate the __NEXT_DATA__ JSON in a profile page.
+
+    Feed raw (undecoded) body chunks; ``feed`` returns True once the closing
+    script tag or the "Profile does not exist" marker has been seen, so
+    callers can stop reading the body. Only the JSON slice is ever copied
+    out of the buffer; nothing is decoded to str.
+    """
+
+    __slots__ = ("_buffer", "_start", "_end", "_scanned", "_missing", "_missing_scanned")
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._start = -1
+        self._end = -1
+        self._scanned = 0
+        self._missing = False
+        self._missing_scanned = 0
+
+    @property
+    def done(self):
+        return self._end != -1 or self._missing
+
+    def feed(self, chunk):
+        if self.done:
+            return True
+
+        buffer = self._buffer
+        buffer += chunk
+        found = self._find_data(buffer)
+        # A missing profile is known as soon as the marker shows up; stop there
+        return self._find_missing(buffer) or found
+
+    def _find_data(self, buffer):
+        if self._start == -1:
+            # Resume just before the previous chunk boundary in case the tag straddles it
+            pos = buffer.find(NEXT_DATA_OPEN, max(0, self._scanned - len(NEXT_DATA_OPEN) + 1))
+            if pos == -1:
+                self._scanned = len(buffer)
+                return False
+            self._start = pos + len(NEXT_DATA_OPEN)
+            self._scanned = self._start
+
+        pos = buffer.find(NEXT_DATA_CLOSE, max(self._start, self._scanned - len(NEXT_DATA_CLOSE) + 1))
+        if pos == -1:
+            self._scanned = len(buffer)
+            return False
+
+        self._end = pos
+        return True
+
+    def _find_missing(self, buffer):
+        # Only the page up to the end of __NEXT_DATA__ counts
+        end = self._end if self._end != -1 else len(buffer)
+        start = max(0, self._missing_scanned - len(PROFILE_MISSING_MARKER) + 1)
+        self._missing = buffer.find(PROFILE_MISSING_MARKER, start, end) != -1
+        self._missing_scanned = end
+        return self._missing
+
+    def json_bytes(self):
+        """The raw JSON payload, or None if the script tag was not found"""
+        if self._end == -1:
+            return None
+        return bytes(self._buffer[self._start:self._end])
+
+    def profile_missing(self):
+        """True if the page read so far says the profile does not exist"""
+        return self._missing
+
+    @property
+    def bytes_read(self):
+        return len(self._buffer)
+
+
+def extract_next_data(content):
+    """Return (json_bytes or None, profile_missing) for a complete page body"""
+    reader = NextDataReader()
+    reader.feed(content)
+    return reader.json_bytes(), reader.profile_missing()
@@ -0,0 +1,213 @@
+import sys
+import json
+import hashlib
+from array import array
+from heatmap import Heatmap
+
+# (userSubmissionsInfo key, API key), in the order the API lists them
+DIFFICULTIES = (
+    ("Basic", "basic"),
+    ("Easy", "easy"),
+    ("Medium", "medium"),
+    ("Hard", "hard"),
+)
+
+# The submission endpoint has always linked to practice.*, the rest to www.*
+PRACTICE_PROBLEM_URL = "https://practice.geeksforgeeks.org/problems/"
+PROBLEM_URL = "https://www.geeksforgeeks.org/problems/"
+
+
+
+def _dict(value):
+    return value if isinstance(value, dict) else {}
+
+
+class Profile:
+    """The parts of a profile's __NEXT_DATA__ the API serves, and nothing else.
+
+    Solved problems are kept per difficulty as parallel tuples of interned
+    names and slugs; URLs are built only when a response needs them, and
+    users who solved the same problem share the same string objects.
+    """
+
+    _FIELDS = (
+        "fullname",
+        "institution",
+        "joined_date",
+        "score",
+        "problems_solved",
+        "monthly_score",
+        "longest_streak",
+        "contest_rating",
+        "overall_rank",
+        "languages",
+        "heatmap",
+        "solved_counts",
+        "problem_names",
+        "problem_slugs",
+    )
+    # Rendered problem lists by URL prefix and the content digest, built on first use
+    __slots__ = _FIELDS + ("_problem_lists", "_digest")
+
+    def __init__(self):
+        self.fullname = None
+        self.institution = None
+        self.joined_date = None
+        self.score = None
+        self.problems_solved = None
+        self.monthly_score = None
+        self.longest_streak = None
+        self.contest_rating = None
+        self.overall_rank = None
+        self.languages = ()
+        self.heatmap = Heatmap()
+        self.solved_counts = (0,) * len(DIFFICULTIES)
+        self.problem_names = ((),) * len(DIFFICULTIES)
+        self.problem_slugs = ((),) * len(DIFFICULTIES)
+        self._problem_lists = None
+        self._digest = None
+
+    @classmethod
+    def from_next_data(cls, data):
+        """Build a Profile from the parsed __NEXT_DATA__ tree"""
+        profile = cls()
+        page_props = _dict(_dict(_dict(data).get("props")).get("pageProps"))
+
+        user_info = _dict(page_props.get("userInfo"))
+        if user_info:
+            profile.fullname = user_info.get("name")
+            profile.institution = user_info.get("institute_name")
+            profile.joined_date = user_info.get("created_date")
+            profile.score = user_info.get("score")
+            profile.problems_solved = user_info.get("total_problems_solved")
+            profile.monthly_score = user_info.get("monthly_score")
+            profile.longest_streak = user_info.get("pod_solved_longest_streak")
+
+            contest_data = _dict(page_props.get("contestData"))
+            profile.contest_rating = _dict(contest_data.get("user_contest_data")).get(
+                "current_rating"
+            )
+            profile.overall_rank = contest_data.get("user_global_rank")
+
+            heat_map = _dict(page_props.get("heatMapData")).get("result")
+            if heat_map:
+                profile.heatmap = Heatmap.from_result(heat_map)
+
+        languages = page_props.get("languages")
+        if languages and isinstance(languages, str):
+            profile.languages = tuple(
+                sys.intern(language.strip()) for language in languages.split(",")
+            )
+
+        profile._load_submissions(_dict(page_props.get("userSubmissionsInfo")))
+        return profile
+
+    def _load_submissions(self, user_submissions):
+        counts, names, slugs = [], [], []
+        for difficulty, key in DIFFICULTIES:
+            submissions = user_submissions.get(difficulty) or {}
+            difficulty_names = []
+            difficulty_slugs = []
+            if isinstance(submissions, dict):
+                for problem_data in submissions.values():
+                    if not problem_data:
+                        continue
+                    problem_name = problem_data.get("pname", "")
+                    problem_slug = problem_data.get("slug", "")
+                    if problem_name and problem_slug:
+                        difficulty_names.append(sys.intern(problem_name))
+                        difficulty_slugs.append(sys.intern(problem_slug))
+            counts.append(len(submissions))
+            names.append(tuple(difficulty_names))
+            slugs.append(tuple(difficulty_slugs))
+
+        self.solved_counts = tuple(counts)
+        self.problem_names = tuple(names)
+        self.problem_slugs = tuple(slugs)
+
+    def to_dict(self):
+        """JSON-serializable form, for sharing a fetched profile between processes"""
+        state = {slot: getattr(self, slot) for slot in self._FIELDS}
+        state["heatmap"] = [self.heatmap.start, self.heatmap.counts.tolist()]
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        profile = cls()
+        for slot in cls._FIELDS:
+            if slot in state and slot != "heatmap":
+                setattr(profile, slot, state[slot])
+        profile.languages = tuple(map(sys.intern, profile.languages))
+        profile.solved_counts = tuple(profile.solved_counts)
+        profile.problem_names = tuple(
+            tuple(map(sys.intern, names)) for names in profile.problem_names
+        )
+        profile.problem_slugs = tuple(
+            tuple(map(sys.intern, slugs)) for slugs in profile.problem_slugs
+        )
+        start, counts = state.get("heatmap") or (0, [])
+        profile.heatmap = Heatmap(start, array("I", counts))
+        return profile
+
+    def iter_problems(self):
+        """Yield (difficulty key, name, slug) for every solved problem"""
+        for (difficulty, key), names, slugs in zip(
+            DIFFICULTIES, self.problem_names, self.problem_slugs
+        ):
+            for name, slug in zip(names, slugs):
+                yield key, name, slug
+
+    def approx_size(self):
+        """Approximate bytes held by this profile, for cache accounting"""
+        size = sys.getsizeof(self)
+        for slot in self._FIELDS:
+            value = getattr(self, slot)
+            size += sys.getsizeof(value)
+            if isinstance(value, Heatmap):
+                size += value.approx_size()
+            elif isinstance(value, tuple):
+                for item in value:
+                    if isinstance(item, tuple):
+                        size += sys.getsizeof(item) + sum(map(sys.getsizeof, item))
+                    else:
+                        size += sys.getsizeof(item)
+        return size
+
+
+def problem_lists(profile, url_prefix=PROBLEM_URL):
+    """Return {difficulty key: [{"name", "url"}, ...]} for a profile.
+
+    Built in one pass and kept on the Profile, so every endpoint and repeated
+    request for a cached profile reuse the same lists, and they are freed
+    with it. Callers must treat the result as read-only.
+    """
+    rendered = profile._problem_lists
+    if rendered is None:
+        rendered = profile._problem_lists = {}
+    lists = rendered.get(url_prefix)
+    if lists is None:
+        # Racing threads may both render; either result is fine
+        lists = rendered[url_prefix] = {
+            key: [
+                {"name": name, "url": url_prefix + slug + "/0"}
+                for name, slug in zip(names, slugs)
+            ]
+            for (difficulty, key), names, slugs in zip(
+                DIFFICULTIES, profile.problem_names, profile.problem_slugs
+            )
+        }
+    return lists
+
+
+def profile_digest(profile):
+    """Hex digest of a profile's normalized content.
+
+    Equal for two fetches that parsed to the same data, so it can validate
+    responses across refetches; computed once per Profile object and kept
+    on it.
+    """
+    digest = profile._digest
+    if digest is None:
+        canonical = json.dumps(profile.to_dict(), sort_keys=True, separators=(",", ":"))
+        digest = profile._digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    return digest
@@ -0,0 +1,124 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PROFILE_STORE_MAX_AGE = float(os.getenv("PROFILE_STORE_MAX_AGE", 300))  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    username TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    validated_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+)
+"""
+
+
+class StoredProfile:
+
+    __slots__ = ("username", "payload", "fetched_at", "validated_at", "etag", "last_modified")
+
+    def __init__(self, username, payload, fetched_at, validated_at, etag, last_modified):
+        self.username = username
+        self.payload = payload
+        self.fetched_at = fetched_at
+        self.validated_at = validated_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def age(self, now=None):
+        return (now or time.time()) - self.validated_at
+
+    def conditional_headers(self):
+        """Request headers that let upstream answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ProfileStore:
+    """SQLite-backed store of raw __NEXT_DATA__ payloads that survives restarts.
+
+    Entries younger than ``max_age`` (since they were last fetched or
+    revalidated) can be served without contacting upstream; older ones are
+    revalidated with a conditional GET using the stored ETag/Last-Modified.
+    """
+
+    def __init__(self, path, max_age=PROFILE_STORE_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        self.hits = 0
+        self.revalidated = 0
+        self.writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().execute(_SCHEMA)
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads, nor between
+        # processes forked after they were opened (e.g. gunicorn --preload)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, username):
+        row = self._connection().execute(
+            "SELECT username, payload, fetched_at, validated_at, etag, last_modified "
+            "FROM profiles WHERE username = ?",
+            (username,),
+        ).fetchone()
+        if row is None:
+            return None
+        return StoredProfile(*row)
+
+    def is_fresh(self, stored):
+        return stored.age() <= self.max_age
+
+    def put(self, username, payload, etag=None, last_modified=None):
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO profiles "
+            "(username, payload, fetched_at, validated_at, etag, last_modified) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (username, payload, now, now, etag, last_modified),
+        )
+        self.writes += 1
+
+    def touch(self, username):
+        """Record a successful revalidation (upstream answered 304)"""
+        self._connection().execute(
+            "UPDATE profiles SET validated_at = ? WHERE username = ?",
+            (time.time(), username),
+        )
+        self.revalidated += 1
+
+    def delete(self, username):
+        self._connection().execute("DELETE FROM profiles WHERE username = ?", (username,))
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def stats(self):
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "writes": self.writes,
+            "max_age": self.max_age,
+        }
@@ -0,0 +1,222 @@
+import io
+import os
+import sys
+import time
+import hmac
+import random
+import marshal
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Admin endpoints are disabled unless a token is configured
+PROFILER_ADMIN_TOKEN = os.getenv("PROFILER_ADMIN_TOKEN", "")
+PROFILER_HEADER = "X-Profile"
+PROFILER_SAMPLE_INTERVAL = float(os.getenv("PROFILER_SAMPLE_INTERVAL", 0.005))  # seconds
+PROFILER_MAX_STACKS = int(os.getenv("PROFILER_MAX_STACKS", 5000))  # per route
+PROFILER_MAX_DEPTH = 64
+
+MODES = ("off", "cprofile", "sampling")
+_TRUNCATED = "[truncated]"
+
+
+def is_admin(headers, token=None):
+    token = PROFILER_ADMIN_TOKEN if token is None else token
+    supplied = headers.get("X-Admin-Token", "")
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _collapse(frame, max_depth=PROFILER_MAX_DEPTH):
+    names = []
+    while frame is not None and len(names) < max_depth:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class RequestProfiler:
+    """Opt-in per-route profiling of API requests.
+
+    ``cprofile`` mode profiles a ``sample_rate`` fraction of requests (plus any
+    request carrying ``X-Profile: 1``) and merges them into one pstats table
+    per route. ``sampling`` mode runs a background thread that snapshots the
+    stacks of in-flight requests every ``interval`` seconds and counts them as
+    collapsed stacks, at most ``max_stacks`` distinct ones per route.
+
+    When the mode is ``off``, ``start`` returns immediately and nothing else
+    runs. State is per process; ``stats`` reports the pid it belongs to.
+    """
+
+    def __init__(self, interval=PROFILER_SAMPLE_INTERVAL, max_stacks=PROFILER_MAX_STACKS):
+        self.mode = "off"
+        self.sample_rate = 0.0
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        # cProfile allows one active profiler at a time; extra requests skip it
+        self._cprofile_lock = threading.Lock()
+        self._active = {}  # thread id -> route, for the sampler
+        self._pstats = {}
+        self._stacks = {}
+        self._requests = Counter()
+        self._sampler = None
+        self._stop_sampler = threading.Event()
+        self.started_at = None
+
+    def configure(self, mode, sample_rate=None, interval=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiler mode '{mode}', expected one of {', '.join(MODES)}")
+        if sample_rate is not None:
+            sample_rate = float(sample_rate)
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0 and 1")
+            self.sample_rate = sample_rate
+        if interval is not None:
+            interval = float(interval)
+            if interval <= 0:
+                raise ValueError("interval must be positive")
+            self.interval = interval
+
+        self._stop_sampling()
+        self.mode = mode
+        self.started_at = time.time() if mode != "off" else None
+        if mode == "sampling":
+            self._start_sampling()
+        logger.info("Profiler mode set to %s (sample_rate=%s)", mode, self.sample_rate)
+
+    def reset(self):
+        with self._lock:
+            self._pstats.clear()
+            self._stacks.clear()
+            self._requests.clear()
+
+    def start(self, route, headers):
+        """Begin profiling the current request; returns a token for ``stop``"""
+        mode = self.mode
+        if mode == "off":
+            return None
+
+        forced = headers.get(PROFILER_HEADER) == "1"
+        if not forced and random.random() >= self.sample_rate:
+            return None
+
+        route = route or "unmatched"
+        if mode == "sampling":
+            self._active[threading.get_ident()] = route
+            return (mode, route, None)
+
+        if not self._cprofile_lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return (mode, route, profile)
+
+    def stop(self, token):
+        if token is None:
+            return
+
+        mode, route, profile = token
+        if mode == "sampling":
+            self._active.pop(threading.get_ident(), None)
+            with self._lock:
+                self._requests[route] += 1
+            return
+
+        profile.disable()
+        self._cprofile_lock.release()
+        with self._lock:
+            self._requests[route] += 1
+            stats = self._pstats.get(route)
+            if stats is None:
+                self._pstats[route] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+
+    def _start_sampling(self):
+        self._stop_sampler.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+
+    def _stop_sampling(self):
+        if self._sampler is not None:
+            self._stop_sampler.set()
+            self._sampler.join()
+            self._sampler = None
+        self._active.clear()
+
+    def _sample_loop(self):
+        while not self._stop_sampler.wait(self.interval):
+            active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, route in active.items():
+                    frame = frames.get(thread_id)
+                    if frame is None:
+                        continue
+                    self._record_stack(route, _collapse(frame))
+
+    def _record_stack(self, route, stack):
+        stacks = self._stacks.setdefault(route, Counter())
+        if stack not in stacks and len(stacks) >= self.max_stacks:
+            stack = _TRUNCATED
+        stacks[stack] += 1
+
+    def routes(self):
+        with self._lock:
+            return sorted(set(self._pstats) | set(self._stacks))
+
+    def dump_pstats(self, route):
+        """Return the merged pstats for route in the binary format pstats.Stats loads"""
+        with self._lock:
+            stats = self._pstats.get(route)
+            if stats is None:
+                return None
+            return marshal.dumps(stats.stats)
+
+    def dump_collapsed(self, route):
+        """Return ``stack count`` lines for flamegraph.pl / speedscope"""
+        with self._lock:
+            stacks = self._stacks.get(route)
+            if stacks is None:
+                return None
+            lines = [f"{stack} {count}" for stack, count in stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+    def summary(self, route, limit=20):
+        """Top functions by cumulative time for route, as pstats text"""
+        with self._lock:
+            stats = self._pstats.get(route)
+            if stats is None:
+                return None
+            stream = io.StringIO()
+            stats.stream = stream
+            stats.sort_stats("cumulative").print_stats(limit)
+            stats.stream = sys.stdout
+        return stream.getvalue()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "mode": self.mode,
+                "sample_rate": self.sample_rate,
+                "interval": self.interval,
+                "started_at": self.started_at,
+                "requests": dict(self._requests),
+                "routes": {
+                    route: {"distinct_stacks": len(stacks), "samples": sum(stacks.values())}
+                    for route, stacks in self._stacks.items()
+                },
+                "pstats_routes": sorted(self._pstats),
+            }
@@ -0,0 +1,187 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | sqlite
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "rate_limits.db")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+
+
+def _sliding_window_estimate(window, now, key_window, current, previous):
+    """Weighted request count over the last ``window`` seconds.
+
+    The sliding-window-counter approximation: the previous fixed window's
+    count is weighted by how much of it still overlaps the sliding window.
+    Returns (window index, current count, previous count, estimate) rolled
+    forward to ``now``.
+    """
+    now_window = int(now // window)
+    if key_window != now_window:
+        previous = current if key_window == now_window - 1 else 0
+        current = 0
+    elapsed = (now % window) / window
+    return now_window, current, previous, previous * (1.0 - elapsed) + current
+
+
+class MemoryRateLimiter:
+    """Per-process sliding-window-counter limiter with O(1) work per request.
+
+    Keys live in an LRU-ordered dict; keys idle for more than two windows no
+    longer affect the count and are expired from the front, and at most
+    ``max_keys`` are kept.
+    """
+
+    def __init__(self, limit, window, max_keys=RATE_LIMIT_MAX_KEYS, clock=time.time):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._clock = clock
+        self._counters = OrderedDict()  # key -> [window index, current, previous]
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key, cost=1):
+        """Count a request of ``cost`` units; returns True if it is rate limited"""
+        now = self._clock()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = [int(now // self.window), 0, 0]
+                self._counters[key] = counter
+            else:
+                self._counters.move_to_end(key)
+
+            counter[0], counter[1], counter[2], estimate = _sliding_window_estimate(
+                self.window, now, *counter
+            )
+            self._expire(counter[0])
+
+            if estimate + cost > self.limit:
+                self.rejected += 1
+                return True
+
+            counter[1] += cost
+            self.allowed += 1
+            return False
+
+    def _expire(self, now_window):
+        counters = self._counters
+        while counters:
+            oldest_key = next(iter(counters))
+            if len(counters) > self.max_keys or counters[oldest_key][0] < now_window - 1:
+                del counters[oldest_key]
+            else:
+                break
+
+    def __len__(self):
+        return len(self._counters)
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "keys": len(self._counters),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+class SQLiteRateLimiter:
+    """Sliding-window-counter limiter shared by every process using one SQLite file.
+
+    Each request is a single short ``BEGIN IMMEDIATE`` transaction on one row,
+    so all gunicorn workers on a host enforce one combined limit. Rows idle
+    for more than two windows are deleted once per window.
+    """
+
+    def __init__(self, path, limit, window, clock=time.time):
+        self.path = path
+        self.limit = limit
+        self.window = window
+        self._clock = clock
+        self._local = threading.local()
+        self._last_expiry_window = None
+        self.allowed = 0
+        self.rejected = 0
+
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, window INTEGER NOT NULL, "
+            "current REAL NOT NULL, previous REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        # The limiter is created at import, so gunicorn --preload workers
+        # inherit its connection; each process must open its own
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def hit(self, key, cost=1):
+        now = self._clock()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window, current, previous FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                row = (int(now // self.window), 0, 0)
+
+            now_window, current, previous, estimate = _sliding_window_estimate(
+                self.window, now, *row
+            )
+            limited = estimate + cost > self.limit
+            if not limited:
+                current += cost
+
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, window, current, previous) "
+                "VALUES (?, ?, ?, ?)",
+                (key, now_window, current, previous),
+            )
+
+            if self._last_expiry_window != now_window:
+                self._last_expiry_window = now_window
+                conn.execute("DELETE FROM rate_limits WHERE window < ?", (now_window - 1,))
+
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        if limited:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return limited
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def stats(self):
+        return {
+            "backend": "sqlite",
+            "keys": len(self),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+def create_rate_limiter(limit, window, backend=RATE_LIMIT_BACKEND):
+
+    if backend == "sqlite":
+        return SQLiteRateLimiter(RATE_LIMIT_DB, limit, window)
+    if backend != "memory":
+        logger.warning("Unknown rate limit backend '%s', using memory", backend)
+    return MemoryRateLimiter(limit, window)
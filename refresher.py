@@ -0,0 +1,153 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+REFRESH_MAX_WORKERS = int(os.getenv("REFRESH_MAX_WORKERS", 2))
+REFRESH_MAX_QUEUE = int(os.getenv("REFRESH_MAX_QUEUE", 256))
+
+
+class _RefreshStats:
+
+    def __init__(self):
+        self.submitted = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.wait_total = 0.0
+
+    def record(self, wait, latency, ok):
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.wait_total += wait
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def as_dict(self, queue_depth, max_queue):
+        finished = self.completed + self.failed
+        return {
+            "queue_depth": queue_depth,
+            "max_queue": max_queue,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "latency_avg": (self.latency_total / finished) if finished else 0.0,
+            "latency_max": self.latency_max,
+            "queue_wait_avg": (self.wait_total / finished) if finished else 0.0,
+        }
+
+
+class BackgroundRefresher:
+    """Refresh stale cache entries on a small worker pool.
+
+    Each key is queued at most once at a time, and submissions beyond
+    ``max_queue`` pending keys are dropped rather than piling up; the stale
+    entry keeps being served until a later request queues it again.
+    """
+
+    def __init__(self, refresh, max_workers=REFRESH_MAX_WORKERS, max_queue=REFRESH_MAX_QUEUE):
+        self._refresh = refresh
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gfg-refresh"
+        )
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stats = _RefreshStats()
+
+    def submit(self, key):
+        """Queue a refresh for key; returns False if deduplicated or dropped"""
+        with self._lock:
+            if key in self._pending:
+                self._stats.deduplicated += 1
+                return False
+            if len(self._pending) >= self.max_queue:
+                self._stats.dropped += 1
+                return False
+            self._pending.add(key)
+            self._stats.submitted += 1
+
+        self._executor.submit(self._run, key, time.monotonic())
+        return True
+
+    def _run(self, key, enqueued_at):
+        started = time.monotonic()
+        ok = False
+        try:
+            self._refresh(key)
+            ok = True
+        except Exception as e:
+            logger.warning("Background refresh failed for %s: %s", key, e)
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                self._pending.discard(key)
+                self._stats.record(started - enqueued_at, finished - started, ok)
+
+    def queue_depth(self):
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        with self._lock:
+            return self._stats.as_dict(len(self._pending), self.max_queue)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+class AsyncBackgroundRefresher:
+    """BackgroundRefresher for coroutines, run as tasks on the current loop"""
+
+    def __init__(self, refresh, max_workers=REFRESH_MAX_WORKERS, max_queue=REFRESH_MAX_QUEUE):
+        self._refresh = refresh
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pending = {}
+        self._limit = None
+        self._stats = _RefreshStats()
+
+    def submit(self, key):
+        if key in self._pending:
+            self._stats.deduplicated += 1
+            return False
+        if len(self._pending) >= self.max_queue:
+            self._stats.dropped += 1
+            return False
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_workers)
+
+        self._stats.submitted += 1
+        self._pending[key] = asyncio.ensure_future(self._run(key, time.monotonic()))
+        return True
+
+    async def _run(self, key, enqueued_at):
+        ok = False
+        started = enqueued_at
+        try:
+            async with self._limit:
+                started = time.monotonic()
+                await self._refresh(key)
+                ok = True
+        except Exception as e:
+            logger.warning("Background refresh failed for %s: %s", key, e)
+        finally:
+            self._pending.pop(key, None)
+            self._stats.record(started - enqueued_at, time.monotonic() - started, ok)
+
+    def queue_depth(self):
+        return len(self._pending)
+
+    def stats(self):
+        return self._stats.as_dict(len(self._pending), self.max_queue)
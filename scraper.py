@@ -1,4 +1,3 @@
-import re
 import json
 import time
 import logging
@@ -6,310 +5,464 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from cache import ProfileCache, PROFILE_CACHE_TTL, PROFILE_CACHE_STALE_TTL
+from singleflight import SingleFlight, FileSingleFlight
+from utils import validate_username
+from extraction_plan import FULL_PROFILE_PLAN, compile_fields
+from next_data import NextDataReader, NEXT_DATA_CHUNK_SIZE
+from profile_store import ProfileStore
+from shared_cache import SharedProfileCache
+from refresher import BackgroundRefresher
+from upstream import UpstreamClient, UPSTREAM_TIMEOUT
+from negative_cache import NegativeCache, NEGATIVE_CACHE_TTL
+from errors import (
+    ScraperError,
+    ProfileNotFoundError,
+    ProfileParseError,
+    UpstreamError,
+    UpstreamBlockedError,
+    UpstreamTimeoutError,
+    error_status,
+)
+from metrics import stage_timer, timed_stage
+from profile_model import (
+    Profile,
+    DIFFICULTIES,
+    PROBLEM_URL,
+    PRACTICE_PROBLEM_URL,
+    problem_lists,
+)
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", 8))
+NEXT_DATA_DRAIN_LIMIT = 16 * 1024  # bytes read past __NEXT_DATA__ to keep the connection
+
 
 class GeeksforGeeksScraper:
 
-    BASE_URL = "https://www.geeksforgeeks.org/user/"
-
-    def __init__(self):
-        """Initialize the scraper with default headers and session"""
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": os.getenv("USER_AGENT", "Default User-Agent"),
-                "Accept": os.getenv("ACCEPT", "*/*"),
-                "Accept-Language": os.getenv("ACCEPT_LANGUAGE", "en-US"),
-                "Referer": os.getenv("REFERER", "https://www.geeksforgeeks.org/"),
-                "DNT": os.getenv("DNT", "1"),
-            }
-        )
+    BASE_URL = os.getenv("GFG_BASE_URL", "https://www.geeksforgeeks.org/user/")
+
+    # Sections that can be requested together for one fetched profile
+    SECTION_EXTRACTORS = {
+        "profile": lambda self, data, username: self._build_complete_profile(
+            data, username
+        ),
+        "info": lambda self, data, username: self._extract_user_info(data, username),
+        "coding_stats": lambda self, data, username: self._extract_next_coding_stats(
+            data
+        ),
+        "submission_data": lambda self, data, username: (
+            self._extract_next_submission_data(data)
+        ),
+        "difficulty_stats": lambda self, data, username: (
+            self._extract_next_difficulty_stats(data)
+        ),
+        "institution_languages": lambda self, data, username: (
+            self._extract_next_institution_languages(data)
+        ),
+        "streak": lambda self, data, username: self._extract_next_streak(data),
+    }
+
+    def __init__(self, cache=None, singleflight=None, store=None, negative_cache=None):
+        """Initialize the scraper with default headers, session and profile cache"""
+        if cache is None and PROFILE_CACHE_TTL > 0:
+            shared_cache_path = os.getenv("SHARED_CACHE_PATH")
+            if shared_cache_path:
+                # One cache for every worker process on the host
+                cache = SharedProfileCache(shared_cache_path, stale_ttl=PROFILE_CACHE_STALE_TTL)
+            else:
+                cache = ProfileCache(stale_ttl=PROFILE_CACHE_STALE_TTL)
+        self.cache = cache
+
+        # Usernames recently found not to exist are rejected without a fetch
+        if negative_cache is None and NEGATIVE_CACHE_TTL > 0:
+            negative_cache = NegativeCache()
+        self.negative_cache = negative_cache
+
+        if singleflight is None:
+            singleflight_dir = os.getenv("SINGLEFLIGHT_DIR")
+            if singleflight_dir:
+                singleflight = FileSingleFlight(
+                    singleflight_dir,
+                    dumps=lambda result: json.dumps([result[0].to_dict(), result[1]]),
+                    loads=lambda s: self._load_shared_result(json.loads(s)),
+                    on_shared=self._cache_shared_result,
+                )
+            else:
+                singleflight = SingleFlight()
+        self.singleflight = singleflight
+
+        if store is None:
+            store_path = os.getenv("PROFILE_STORE_PATH")
+            if store_path:
+                store = ProfileStore(store_path)
+        self.store = store
+
+        # Serve stale cache entries while refreshing them in the background
+        self.refresher = None
+        if self.cache is not None and self.cache.stale_ttl > self.cache.ttl:
+            self.refresher = self._create_refresher()
+
+        self.batch_max_workers = BATCH_MAX_WORKERS
+        self._batch_executor = None
+        self._batch_executor_lock = threading.Lock()
+
+        # Called with (username, profile) after every fetch
+        self.listeners = []
+
+        self.upstream = UpstreamClient(headers=self._default_headers())
+        self.session = self.upstream.session
+
+    @staticmethod
+    def _default_headers():
+        return {
+            "User-Agent": os.getenv("USER_AGENT", "Default User-Agent"),
+            "Accept": os.getenv("ACCEPT", "*/*"),
+            "Accept-Language": os.getenv("ACCEPT_LANGUAGE", "en-US"),
+            "Referer": os.getenv("REFERER", "https://www.geeksforgeeks.org/"),
+            "DNT": os.getenv("DNT", "1"),
+        }
 
+    @timed_stage("get_profile_data")
     def _get_profile_data(self, username):
-        
-        url = f"{self.BASE_URL}{username}/"
-        logger.debug(f"Fetching profile from URL: {url}")
-
-        try:
-            response = self.session.get(url, timeout=10)
 
-            match = re.search(
-                r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>',
-                response.text,
-                re.DOTALL,
+        if self.cache is not None:
+            cached, stale = self.cache.lookup(
+                username, allow_stale=self.refresher is not None
             )
-            if not match:
-                raise Exception(
-                    f"Could not find Next.js data in the profile page for '{username}'"
-                )
+            if cached is not None:
+                if stale:
+                    logger.debug("Serving stale profile for %s", username)
+                    self.refresher.submit(username)
+                else:
+                    logger.debug("Profile cache hit for %s", username)
+                return cached
+
+        if self.negative_cache is not None and username in self.negative_cache:
+            logger.debug("Negative cache hit for %s", username)
+            raise ProfileNotFoundError(f"Profile '{username}' does not exist")
+
+        data, size = self.singleflight.do(
+            username, lambda: self._fetch_and_cache(username)
+        )
+        return data
 
-            json_data = match.group(1)
-            data = json.loads(json_data)
+    @staticmethod
+    def _load_shared_result(result):
 
-            if "Profile does not exist" in response.text:
-                raise Exception(f"Profile '{username}' does not exist")
+        state, size = result
+        return Profile.from_dict(state), size
 
-            return data
+    def _cache_shared_result(self, username, result):
+        # Another process fetched it; keep it as if this one had
+        data, size = result
+        if self.cache is not None:
+            self.cache.set(username, data, size)
+        if self.negative_cache is not None:
+            self.negative_cache.discard(username)
+        self._notify_listeners(username, data)
 
-        except requests.RequestException as e:
-            logger.error(f"Request error: {str(e)}")
-            raise Exception(f"Failed to fetch profile: {str(e)}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing JSON: {str(e)}")
-            raise Exception(f"Failed to parse profile data: {str(e)}")
-        except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
-            raise
+    def _create_refresher(self):
 
-    def get_complete_profile(self, username):
-        
-        profile_data = self._get_profile_data(username)
+        return BackgroundRefresher(self._refresh_profile)
+
+    def _refresh_profile(self, username):
 
-        user_info = self._extract_user_info(profile_data, username)
-        coding_stats = self._extract_next_coding_stats(profile_data)
-        difficulty_stats = self._extract_next_difficulty_stats(
-            profile_data, include_problems=True
+        self.singleflight.do(
+            username, lambda: self._fetch_and_cache(username, revalidate=True)
         )
-        institution_languages = self._extract_next_institution_languages(profile_data)
-        streak_data = self._extract_next_streak(profile_data)
-
-        complete_profile = {
-            "info": {
-                "username": user_info.get("username"),
-                "fullname": user_info.get("fullname"),
-                "qualification": user_info.get("qualification"),
-                "joined_date": user_info.get("joined_date"),
-                "institution": institution_languages.get("institution"),
-                "languages_used": institution_languages.get("languages_used"),
-            },
-            "solved_stats": {
-                "coding_score": coding_stats.get("coding_score"),
-                "problems_solved": coding_stats.get("problems_solved"),
-                "contest_rating": coding_stats.get("contest_rating"),
-                "overall_rank": coding_stats.get("overall_rank"),
-                "total_submissions": coding_stats.get("problems_solved"),
-                "monthly_score": streak_data.get("monthly_score"),
-                "current_streak": streak_data.get("current_streak"),
-                "longest_streak": streak_data.get("longest_streak"),
-                "difficulty_breakdown": difficulty_stats.get("solved_by_difficulty"),
-                "problems_by_difficulty": difficulty_stats.get(
-                    "problems_by_difficulty", {}
-                ),
-            },
-        }
 
-        return complete_profile
+    def refresh_profile(self, username):
+        """Fetch username now, revalidating with upstream, and update cache, store and listeners"""
+        data, size = self.singleflight.do(
+            username, lambda: self._fetch_and_cache(username, revalidate=True)
+        )
+        return data
 
-    def get_basic_info(self, username):
-        
-        profile_data = self._get_profile_data(username)
-        return self._extract_user_info(profile_data, username)
+    def _fetch_and_cache(self, username, revalidate=False):
 
-    def _extract_user_info(self, profile_data, username):
-        
-        basic_info = {"username": username, "qualification": None, "fullname": None}
+        try:
+            data, size = self._fetch_profile_data(username, revalidate)
+        except ProfileNotFoundError:
+            if self.negative_cache is not None:
+                self.negative_cache.add(username)
+            raise
+        if self.negative_cache is not None:
+            self.negative_cache.discard(username)
+
+        if self.cache is not None:
+            self.cache.set(username, data, size)
+
+        self._notify_listeners(username, data)
+        return data, size
+
+    def add_listener(self, listener):
+        """Register listener(username, profile), called whenever a profile is fetched"""
+        self.listeners.append(listener)
+
+    def _notify_listeners(self, username, profile):
+
+        for listener in self.listeners:
+            try:
+                listener(username, profile)
+            except Exception as e:
+                logger.error("Profile listener failed for %s: %s", username, e)
+
+    def _fetch_profile_data(self, username, revalidate=False):
+
+        stored = self.store.get(username) if self.store is not None else None
+        # Refreshes always ask upstream, conditionally if a copy is stored
+        if stored is not None and not revalidate and self.store.is_fresh(stored):
+            logger.debug("Profile store hit for %s", username)
+            self.store.hits += 1
+            return self._load_stored_profile(stored)
+
+        url = f"{self.BASE_URL}{username}/"
+        logger.debug("Fetching profile from URL: %s", url)
+        headers = stored.conditional_headers() if stored is not None else None
 
         try:
-            user_info = (
-                profile_data.get("props", {}).get("pageProps", {}).get("userInfo", {})
+            with stage_timer("upstream_request"):
+                response = self.upstream.get(
+                    url, headers=headers, timeout=UPSTREAM_TIMEOUT, stream=True
+                )
+            try:
+                if response.status_code == 304 and stored is not None:
+                    logger.debug("Profile for %s not modified upstream", username)
+                    self.store.touch(username)
+                    return self._load_stored_profile(stored)
+
+                self._check_status(response.status_code, username)
+
+                with stage_timer("body_read"):
+                    reader = NextDataReader()
+                    chunks = response.iter_content(chunk_size=NEXT_DATA_CHUNK_SIZE)
+                    for chunk in chunks:
+                        if reader.feed(chunk):
+                            break
+                    self._drain_response(chunks)
+            finally:
+                response.close()
+
+            profile, json_data = self._parse_next_data(reader, username)
+
+            if self.store is not None:
+                self.store.put(
+                    username,
+                    json_data,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
+
+            return profile, profile.approx_size()
+
+        except requests.Timeout as e:
+            logger.error("Request timed out: %s", e)
+            raise UpstreamTimeoutError(f"Failed to fetch profile: {str(e)}")
+        except requests.RequestException as e:
+            logger.error("Request error: %s", e)
+            raise UpstreamError(f"Failed to fetch profile: {str(e)}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error("Error parsing JSON: %s", e)
+            raise ProfileParseError(f"Failed to parse profile data: {str(e)}")
+        except ScraperError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            raise
+
+    def _load_stored_profile(self, stored):
+
+        with stage_timer("json_parse"):
+            profile = Profile.from_next_data(json.loads(stored.payload))
+        return profile, profile.approx_size()
+
+    @staticmethod
+    def _drain_response(chunks, limit=NEXT_DATA_DRAIN_LIMIT):
+        # __NEXT_DATA__ sits near the end of the page, so reading the short
+        # remainder lets urllib3 return the connection to the keep-alive pool
+        drained = 0
+        for chunk in chunks:
+            drained += len(chunk)
+            if drained > limit:
+                break
+
+    @staticmethod
+    def _check_status(status, username):
+        # Fail on error statuses before reading the body
+        if status == 404:
+            raise ProfileNotFoundError(f"Profile '{username}' does not exist")
+        if status in (403, 429):
+            raise UpstreamBlockedError(
+                f"Failed to fetch profile: upstream refused the request ({status})"
             )
+        if status >= 400:
+            raise UpstreamError(f"Failed to fetch profile: upstream returned {status}")
 
-            if user_info:
-                if "name" in user_info:
-                    basic_info["fullname"] = user_info.get("name")
+    def _parse_next_data(self, reader, username):
 
-                if "institute_name" in user_info:
-                    basic_info["qualification"] = user_info.get("institute_name")
+        # The reader stops at the not-found marker, before any JSON
+        if reader.profile_missing():
+            raise ProfileNotFoundError(f"Profile '{username}' does not exist")
 
-                if "created_date" in user_info:
-                    basic_info["joined_date"] = user_info.get("created_date")
+        json_data = reader.json_bytes()
+        if json_data is None:
+            raise ProfileParseError(
+                f"Could not find Next.js data in the profile page for '{username}'"
+            )
 
+        with stage_timer("json_parse"):
+            profile = Profile.from_next_data(json.loads(json_data))
+        return profile, json_data
 
-        except Exception as e:
-            logger.error(f"Error extracting basic info: {str(e)}")
+    def get_profile(self, username):
+        """Return the cached or freshly fetched Profile model for username"""
+        return self._get_profile_data(username)
 
-        return basic_info
+    def freshness(self, username):
+        """Seconds the cached profile for username stays fresh; 0 if uncached or stale"""
+        if self.cache is None:
+            return 0
+        return self.cache.ttl_remaining(username) or 0
 
-    def get_coding_stats(self, username):
+    def get_complete_profile(self, username, fields=None):
         
         profile_data = self._get_profile_data(username)
-        return self._extract_next_coding_stats(profile_data)
+        return self._build_complete_profile(
+            profile_data, username, compile_fields(fields)
+        )
 
-    def _extract_next_coding_stats(self, profile_data):
-        
-        coding_stats = {
-            "coding_score": None,
-            "problems_solved": None,
-            "contest_rating": None,
-            "overall_rank": None,
-        }
+    def _build_complete_profile(self, profile_data, username, plan=FULL_PROFILE_PLAN):
 
-        try:
-            user_info = (
-                profile_data.get("props", {}).get("pageProps", {}).get("userInfo", {})
+        extractors = plan.extractors
+        extracted = {}
+
+        if "user_info" in extractors:
+            extracted["user_info"] = self._extract_user_info(profile_data, username)
+        if "coding_stats" in extractors:
+            extracted["coding_stats"] = self._extract_next_coding_stats(profile_data)
+        if "difficulty_stats" in extractors or "difficulty_problems" in extractors:
+            # Problem lists are only built when they were asked for
+            difficulty_stats = self._extract_next_difficulty_stats(
+                profile_data, include_problems=plan.include_problems
             )
+            extracted["difficulty_stats"] = difficulty_stats
+            extracted["difficulty_problems"] = difficulty_stats
+        if "institution_languages" in extractors:
+            extracted["institution_languages"] = (
+                self._extract_next_institution_languages(profile_data)
+            )
+        if "streak" in extractors:
+            extracted["streak"] = self._extract_next_streak(profile_data)
+
+        complete_profile = {}
+        for section, field, extractor, key in plan.fields:
+            complete_profile.setdefault(section, {})[field] = extracted[extractor].get(key)
 
-            if user_info:
-                if "score" in user_info:
-                    coding_stats["coding_score"] = user_info.get("score")
+        return complete_profile
 
-                if "total_problems_solved" in user_info:
-                    coding_stats["problems_solved"] = user_info.get(
-                        "total_problems_solved"
-                    )
+    def iter_complete_profile(self, username, fields=None):
+        """Fetch a profile and return a generator of streamable records.
 
-                contest_data = (
-                    profile_data.get("props", {})
-                    .get("pageProps", {})
-                    .get("contestData", {})
-                )
-                if contest_data:
-                    user_contest_data = contest_data.get("user_contest_data", {})
-                    if user_contest_data and "current_rating" in user_contest_data:
-                        coding_stats["contest_rating"] = user_contest_data.get(
-                            "current_rating"
-                        )
-
-                    if "user_global_rank" in contest_data:
-                        coding_stats["overall_rank"] = contest_data.get(
-                            "user_global_rank"
-                        )
+        The first record holds the profile without problem lists; each solved
+        problem then follows as its own record, so problem lists are never
+        materialized in memory.
+        """
+        profile_data = self._get_profile_data(username)
+        return self._iter_complete_profile(
+            profile_data, username, compile_fields(fields)
+        )
 
-        except Exception as e:
-            logger.error(f"Error extracting coding stats: {str(e)}")
+    def _iter_complete_profile(self, profile_data, username, plan=FULL_PROFILE_PLAN):
+
+        complete_profile = self._build_complete_profile(
+            profile_data, username, plan.without_problems()
+        )
+        yield {"type": "profile", **complete_profile}
 
-        return coding_stats
+        if not plan.include_problems:
+            return
 
-    def get_submission_data(self, username):
+        for key, problem_name, problem_slug in profile_data.iter_problems():
+            yield {
+                "type": "problem",
+                "difficulty": key,
+                "name": problem_name,
+                "url": PROBLEM_URL + problem_slug + "/0",
+            }
+
+    def get_basic_info(self, username):
         
         profile_data = self._get_profile_data(username)
-        return self._extract_next_submission_data(profile_data)
+        return self._extract_user_info(profile_data, username)
 
-    def _extract_next_submission_data(self, profile_data):
+    @timed_stage("extract_user_info")
+    def _extract_user_info(self, profile, username):
         
-       
-        submission_data = {
-            "total_submissions": None,
-            "monthly_problems_solved": None,
-            "submissions_by_difficulty": {
-                "basic": [],
-                "easy": [],
-                "medium": [],
-                "hard": [],
-            },
+        basic_info = {
+            "username": username,
+            "qualification": profile.institution,
+            "fullname": profile.fullname,
         }
 
-        try:
-            user_info = (
-                profile_data.get("props", {}).get("pageProps", {}).get("userInfo", {})
-            )
+        if profile.joined_date is not None:
+            basic_info["joined_date"] = profile.joined_date
 
-            if user_info:
-                if "total_problems_solved" in user_info:
-                    submission_data["total_submissions"] = user_info.get(
-                        "total_problems_solved"
-                    )
-
-                if "monthly_score" in user_info:
-                    submission_data["monthly_problems_solved"] = user_info.get(
-                        "monthly_score"
-                    )
-
-            user_submissions = (
-                profile_data.get("props", {})
-                .get("pageProps", {})
-                .get("userSubmissionsInfo", {})
-            )
+        return basic_info
 
-            for difficulty, key in [
-                ("Basic", "basic"),
-                ("Easy", "easy"),
-                ("Medium", "medium"),
-                ("Hard", "hard"),
-            ]:
-                if difficulty in user_submissions:
-                    submissions = user_submissions[difficulty]
-                    if submissions:
-                        for problem_id, problem_data in submissions.items():
-                            if problem_data:
-                                problem_name = problem_data.get("pname", "")
-                                problem_slug = problem_data.get("slug", "")
-
-                                if not problem_name or not problem_slug:
-                                    continue
-
-                                problem_url = f"https://practice.geeksforgeeks.org/problems/{problem_slug}/0"
-
-                                submission_data["submissions_by_difficulty"][
-                                    key
-                                ].append({"name": problem_name, "url": problem_url})
+    def get_coding_stats(self, username):
+        
+        profile_data = self._get_profile_data(username)
+        return self._extract_next_coding_stats(profile_data)
 
-        except Exception as e:
-            logger.error(f"Error extracting submission data: {str(e)}")
+    @timed_stage("extract_coding_stats")
+    def _extract_next_coding_stats(self, profile):
+        
+        return {
+            "coding_score": profile.score,
+            "problems_solved": profile.problems_solved,
+            "contest_rating": profile.contest_rating,
+            "overall_rank": profile.overall_rank,
+        }
 
-        return submission_data
+    def get_submission_data(self, username):
+        
+        profile_data = self._get_profile_data(username)
+        return self._extract_next_submission_data(profile_data)
+
+    @timed_stage("extract_submission_data")
+    def _extract_next_submission_data(self, profile):
+        
+        return {
+            "total_submissions": profile.problems_solved,
+            "monthly_problems_solved": profile.monthly_score,
+            "submissions_by_difficulty": problem_lists(profile, PRACTICE_PROBLEM_URL),
+        }
 
     def get_difficulty_stats(self, username):
        
         profile_data = self._get_profile_data(username)
         return self._extract_next_difficulty_stats(profile_data)
 
-    def _extract_next_difficulty_stats(self, profile_data, include_problems=False):
+    @timed_stage("extract_difficulty_stats")
+    def _extract_next_difficulty_stats(self, profile, include_problems=False):
         
         difficulty_stats = {
-            "solved_by_difficulty": {"basic": 0, "easy": 0, "medium": 0, "hard": 0}
+            "solved_by_difficulty": {
+                key: count
+                for (difficulty, key), count in zip(DIFFICULTIES, profile.solved_counts)
+            }
         }
 
         if include_problems:
-            difficulty_stats["problems_by_difficulty"] = {
-                "basic": [],
-                "easy": [],
-                "medium": [],
-                "hard": [],
-            }
-
-        try:
-            user_submissions = (
-                profile_data.get("props", {})
-                .get("pageProps", {})
-                .get("userSubmissionsInfo", {})
-            )
-
-            for difficulty, key in [
-                ("Basic", "basic"),
-                ("Easy", "easy"),
-                ("Medium", "medium"),
-                ("Hard", "hard"),
-            ]:
-                if difficulty in user_submissions:
-                    submissions = user_submissions[difficulty]
-                    difficulty_stats["solved_by_difficulty"][key] = len(submissions)
-
-                    if include_problems and submissions:
-                        for problem_id, problem_data in submissions.items():
-                            if problem_data:
-                                problem_name = problem_data.get("pname", "")
-                                problem_slug = problem_data.get("slug", "")
-
-                                if not problem_name or not problem_slug:
-                                    continue
-
-                                problem_url = f"https://www.geeksforgeeks.org/problems/{problem_slug}/0"
-
-                                difficulty_stats["problems_by_difficulty"][key].append(
-                                    {"name": problem_name, "url": problem_url}
-                                )
-
-        except Exception as e:
-            logger.error(f"Error extracting difficulty stats: {str(e)}")
+            difficulty_stats["problems_by_difficulty"] = problem_lists(profile, PROBLEM_URL)
 
         return difficulty_stats
 
@@ -318,84 +471,100 @@ class GeeksforGeeksScraper:
         profile_data = self._get_profile_data(username)
         return self._extract_next_institution_languages(profile_data)
 
-    def _extract_next_institution_languages(self, profile_data):
+    @timed_stage("extract_institution_languages")
+    def _extract_next_institution_languages(self, profile):
         
-        institution_languages = {"institution": None, "languages_used": []}
-
-        try:
-            # Extract data from userInfo in Next.js data
-            user_info = (
-                profile_data.get("props", {}).get("pageProps", {}).get("userInfo", {})
-            )
-
-            if user_info:
-                if "institute_name" in user_info:
-                    institution_languages["institution"] = user_info.get(
-                        "institute_name"
-                    )
-
-            languages_str = (
-                profile_data.get("props", {}).get("pageProps", {}).get("languages")
-            )
-            if languages_str:
-                languages = [lang.strip() for lang in languages_str.split(",")]
-                institution_languages["languages_used"] = languages
-
-        except Exception as e:
-            logger.error(f"Error extracting institution and languages: {str(e)}")
-
-        return institution_languages
+        return {
+            "institution": profile.institution,
+            "languages_used": list(profile.languages),
+        }
 
     def get_streak(self, username):
         
         profile_data = self._get_profile_data(username)
         return self._extract_next_streak(profile_data)
 
-    def _extract_next_streak(self, profile_data):
+    @timed_stage("extract_streak")
+    def _extract_next_streak(self, profile):
         
         streak_data = {
             "current_streak": None,
-            "longest_streak": None,
-            "monthly_score": None,
+            "longest_streak": profile.longest_streak,
+            "monthly_score": profile.monthly_score,
         }
 
-        try:
-            user_info = (
-                profile_data.get("props", {}).get("pageProps", {}).get("userInfo", {})
+        activity = profile.heatmap.stats()
+        if activity["current_streak"] > 0:
+            streak_data["current_streak"] = activity["current_streak"]
+        streak_data["activity"] = activity
+
+        return streak_data
+
+    def get_sections(self, username, sections):
+
+        profile_data = self._get_profile_data(username)
+        return self._extract_sections(profile_data, sections, username)
+
+    def extract_section(self, profile_data, section, username, fields=None):
+        """Build one SECTION_EXTRACTORS section from an already fetched profile.
+
+        ``fields`` selects a subset of the "profile" section, as for
+        get_complete_profile.
+        """
+        if section == "profile" and fields:
+            return self._build_complete_profile(
+                profile_data, username, compile_fields(fields)
             )
+        return self.SECTION_EXTRACTORS[section](self, profile_data, username)
 
-            if user_info:
-                if "monthly_score" in user_info:
-                    streak_data["monthly_score"] = user_info.get("monthly_score")
+    def _extract_sections(self, profile_data, sections, username):
 
-                if "pod_solved_longest_streak" in user_info:
-                    streak_data["longest_streak"] = user_info.get(
-                        "pod_solved_longest_streak"
-                    )
+        return {
+            section: self.SECTION_EXTRACTORS[section](self, profile_data, username)
+            for section in sections
+        }
 
-                heat_map_data = (
-                    profile_data.get("props", {})
-                    .get("pageProps", {})
-                    .get("heatMapData", {})
-                    .get("result", {})
-                )
-                if heat_map_data:
-                    dates = sorted(heat_map_data.keys(), reverse=True)
-                    current_streak = 0
-
-                    for i, date in enumerate(dates):
-                        if i > 0:
-                            if heat_map_data.get(date):
-                                current_streak += 1
-                            else:
-                                break
-                        elif heat_map_data.get(date):
-                            current_streak = 1
-
-                    if current_streak > 0:
-                        streak_data["current_streak"] = current_streak
+    def get_batch(self, usernames, sections):
+        """Fetch sections for many usernames in parallel, one entry per username"""
+        executor = self._get_batch_executor()
+        return list(
+            executor.map(lambda username: self._batch_entry(username, sections), usernames)
+        )
 
-        except Exception as e:
-            logger.error(f"Error extracting streak data: {str(e)}")
+    def iter_batch(self, usernames, sections):
+        """Like get_batch, but yield each entry as soon as it completes"""
+        executor = self._get_batch_executor()
+        futures = [
+            executor.submit(self._batch_entry, username, sections)
+            for username in usernames
+        ]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Stop queued work if the client goes away mid-stream
+            for future in futures:
+                future.cancel()
 
-        return streak_data
+    def _batch_entry(self, username, sections):
+
+        if not validate_username(username):
+            return {"username": username, "error": "Invalid username parameter", "status": 400}
+
+        try:
+            return {"username": username, "data": self.get_sections(username, sections)}
+        except Exception as e:
+            status = error_status(e)
+            log = logger.error if status >= 500 else logger.debug
+            log("Error scraping batch entry for %s: %s", username, e)
+            return {"username": username, "error": str(e), "status": status}
+
+    def _get_batch_executor(self):
+        # One pool per scraper bounds upstream parallelism across all batches
+        with self._batch_executor_lock:
+            if self._batch_executor is None:
+                self._batch_executor = ThreadPoolExecutor(
+                    max_workers=self.batch_max_workers,
+                    thread_name_prefix="gfg-batch",
+                )
+            return self._batch_executor
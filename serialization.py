@@ -0,0 +1,271 @@
+import os
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from metrics import stage_timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")  # "orjson" or "json"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 5))
+
+if JSON_BACKEND == "orjson" and orjson is None:
+    logger.info("orjson is not installed; using the standard library JSON encoder")
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick the best supported content coding from an Accept-Encoding header.
+
+    Returns "br", "gzip" or None (send the body uncompressed). Brotli wins
+    over gzip at equal quality since it produces smaller JSON.
+    """
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    best = None
+    best_quality = 0.0
+    for coding in supported_encodings():
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class FastJSONMixin:
+    """JSON provider mixin that encodes with orjson when it is available.
+
+    Mix in before Flask's or Quart's DefaultJSONProvider. Output keeps the
+    provider's ``sort_keys`` and compact separators, so it only differs from
+    the standard library in leaving non-ASCII characters unescaped. Debug
+    (indented) responses and values orjson rejects fall back to ``json``.
+    """
+
+    def encode(self, obj):
+        """Serialize obj as a compact UTF-8 response body"""
+        if orjson is not None and JSON_BACKEND == "orjson":
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=self.default, option=option) + b"\n"
+            except TypeError:
+                # e.g. integers wider than 64 bits
+                pass
+        return f"{self.dumps(obj, separators=(',', ':'))}\n".encode()
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+
+class EncodedBody:
+    """A serialized response body and its compressed variants, built on demand.
+
+    When set, ``on_grow(encoded, added_bytes)`` is called instead of updating
+    ``size`` after a variant is added, so an owner can account for it.
+    """
+
+    __slots__ = ("body", "_variants", "size", "on_grow")
+
+    def __init__(self, body, on_grow=None):
+        self.body = body
+        self._variants = {}
+        self.size = len(body)
+        self.on_grow = on_grow
+
+    def variant(self, encoding):
+        """Return (bytes, content coding or None) for a negotiated encoding"""
+        if encoding is None or len(self.body) < COMPRESS_MIN_BYTES:
+            return self.body, None
+        compressed = self._variants.get(encoding)
+        if compressed is None:
+            with stage_timer("compress"):
+                compressed = _compress(self.body, encoding)
+            # Racing threads may both compress; the first result is kept
+            kept = self._variants.setdefault(encoding, compressed)
+            if kept is not compressed:
+                return kept, encoding
+            if self.on_grow is not None:
+                self.on_grow(self, len(compressed))
+            else:
+                self.size += len(compressed)
+        return compressed, encoding
+
+
+class ResponseCache:
+    """LRU of serialized response bodies, bounded by entry count and bytes.
+
+    Keys must identify the data exactly; the profile routes use the
+    response's ETag, which covers the profile's content digest.
+    """
+
+    def __init__(self, encode, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.encode = encode
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0  # bodies plus every compressed variant
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build):
+        """Return the EncodedBody for key, calling build() and encoding on a miss"""
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return encoded
+            self.misses += 1
+
+        data = build()
+        with stage_timer("serialize"):
+            encoded = EncodedBody(
+                self.encode(data), on_grow=lambda grown, added: self._grew(key, grown, added)
+            )
+
+        if self.max_entries > 0:
+            with self._lock:
+                replaced = self._entries.pop(key, None)
+                if replaced is not None:
+                    self._bytes -= replaced.size
+                self._entries[key] = encoded
+                self._bytes += encoded.size
+                self._evict()
+        return encoded
+
+    def _grew(self, key, encoded, added):
+        # A compressed variant was added; it counts against max_bytes too
+        with self._lock:
+            encoded.size += added
+            if self._entries.get(key) is encoded:
+                self._bytes += added
+                self._evict()
+
+    def _evict(self):
+        # Caller holds self._lock
+        while len(self._entries) > self.max_entries or (
+            len(self._entries) > 1 and self._bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def bytes(self):
+        return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def make_etag(*parts):
+    """Strong entity tag (without quotes) for the representation identified by parts"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def etag_matches(if_none_match, etag):
+    """Return the If-None-Match entry that matches etag, or None.
+
+    Compressed variants are tagged ``"<etag>-<coding>"``; any coding of the
+    same representation matches, and W/ prefixes are ignored, as the weak
+    comparison If-None-Match calls for.
+    """
+    if not if_none_match:
+        return None
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return f'"{etag}"'
+        opaque = tag[2:] if tag.startswith("W/") else tag
+        if opaque.strip('"').partition("-")[0] == etag:
+            return tag
+    return None
+
+
+def cache_control(max_age):
+    """Cache-Control for data that stays fresh for max_age more seconds"""
+    max_age = int(max_age or 0)
+    return f"public, max-age={max_age}" if max_age > 0 else "no-cache"
+
+
+def not_modified_response(response_class, tag, max_age=0):
+    return response_class(
+        status=304,
+        headers={"ETag": tag, "Cache-Control": cache_control(max_age), "Vary": "Accept-Encoding"},
+    )
+
+
+def encoded_response(response_class, encoded, accept_encoding, etag=None, max_age=0):
+    """Build a JSON response for an EncodedBody, compressed if the client accepts it"""
+    body, encoding = encoded.variant(negotiate_encoding(accept_encoding))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    if etag is not None:
+        headers["ETag"] = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+        headers["Cache-Control"] = cache_control(max_age)
+    return response_class(body, mimetype="application/json", headers=headers)
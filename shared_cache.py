@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+from cache import ProfileCache, PROFILE_CACHE_TTL
+from profile_model import Profile
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", 100000))
+# Profiles each worker keeps deserialized in memory in front of the database
+SHARED_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_LOCAL_MAX_ENTRIES", 128))
+SHARED_CACHE_PRUNE_EVERY = 256  # writes between expiry/size sweeps
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS profiles (
+        username TEXT PRIMARY KEY,
+        stored_at REAL NOT NULL,
+        payload BLOB NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS profiles_stored_at ON profiles (stored_at)",
+)
+
+
+def _dumps(profile):
+    state = profile.to_dict()
+    if orjson is not None:
+        try:
+            return orjson.dumps(state)
+        except TypeError:
+            pass
+    return json.dumps(state, separators=(",", ":")).encode()
+
+
+def _loads(payload):
+    state = orjson.loads(payload) if orjson is not None else json.loads(payload)
+    return Profile.from_dict(state)
+
+
+class SharedProfileCache:
+    """Profile cache shared by every worker process on the host.
+
+    Parsed profiles are stored, as ``Profile.to_dict`` JSON, in a SQLite
+    database in WAL mode, so any number of processes read concurrently while
+    one writes; a profile fetched by one gunicorn worker is a hit for all
+    of them. Each process keeps a small ProfileCache of deserialized
+    profiles in front of it, holding entries only as long as the shared
+    copy stays fresh. Ages use wall-clock time, which all processes share.
+
+    Same interface as ProfileCache, so it can be passed as the scraper's
+    ``cache``; set ``SHARED_CACHE_PATH`` to have the scraper create one.
+    """
+
+    def __init__(
+        self,
+        path,
+        ttl=PROFILE_CACHE_TTL,
+        stale_ttl=None,
+        max_entries=SHARED_CACHE_MAX_ENTRIES,
+        local_max_entries=SHARED_CACHE_LOCAL_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self._local_cache = ProfileCache(
+            ttl=ttl, stale_ttl=stale_ttl, max_entries=local_max_entries, clock=time.time
+        )
+        self.ttl = self._local_cache.ttl
+        self.stale_ttl = self._local_cache.stale_ttl
+        self._local = threading.local()
+        self._writes_lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        for statement in _SCHEMA:
+            conn.execute(statement)
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads, nor between
+        # processes forked after they were opened (e.g. gunicorn --preload)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _load(self, key, min_stored_at):
+        row = self._connection().execute(
+            "SELECT stored_at, payload FROM profiles WHERE username = ? AND stored_at > ?",
+            (key, min_stored_at),
+        ).fetchone()
+        if row is None:
+            return None, None
+        stored_at, payload = row
+        return _loads(payload), stored_at
+
+    def get(self, key):
+        value, stale = self.lookup(key, allow_stale=False)
+        return value
+
+    def lookup(self, key, allow_stale=True):
+        """Return (value, stale), from this process's copy or the shared database"""
+        value, stale = self._local_cache.lookup(key, allow_stale)
+        if value is not None and not stale:
+            self.hits += 1
+            return value, False
+
+        # Another worker may have stored a newer copy; a stale one we already have
+        # is not worth deserializing again
+        now = time.time()
+        usable_age = self.stale_ttl if allow_stale and value is None else self.ttl
+        shared, stored_at = self._load(key, now - usable_age)
+        if shared is None:
+            if value is None:
+                self.misses += 1
+            else:
+                self.stale_hits += 1
+            return value, stale
+
+        self.loads += 1
+        self._local_cache.set(key, shared, shared.approx_size(), stored_at=stored_at)
+        stale = now - stored_at > self.ttl
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return shared, stale
+
+    def ttl_remaining(self, key):
+        remaining = self._local_cache.ttl_remaining(key)
+        if remaining is not None:
+            return remaining
+        row = self._connection().execute(
+            "SELECT stored_at FROM profiles WHERE username = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return max(0.0, self.ttl - (time.time() - row[0]))
+
+    def set(self, key, value, size=0):
+        now = time.time()
+        self._local_cache.set(key, value, size, stored_at=now)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO profiles (username, stored_at, payload) VALUES (?, ?, ?)",
+            (key, now, _dumps(value)),
+        )
+        with self._writes_lock:
+            self.writes += 1
+            prune = self.writes % SHARED_CACHE_PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Drop expired rows and the oldest rows past max_entries"""
+        conn = self._connection()
+        conn.execute(
+            "DELETE FROM profiles WHERE stored_at < ?", (time.time() - self.stale_ttl,)
+        )
+        conn.execute(
+            "DELETE FROM profiles WHERE username IN ("
+            "SELECT username FROM profiles ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def delete(self, key):
+        self._local_cache.delete(key)
+        self._connection().execute("DELETE FROM profiles WHERE username = ?", (key,))
+
+    def clear(self):
+        self._local_cache.clear()
+        self._connection().execute("DELETE FROM profiles")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def stats(self):
+        # entries/bytes/evictions describe this process's copies
+        stats = self._local_cache.stats()
+        lookups = self.hits + self.stale_hits + self.misses
+        stats.update({
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": ((self.hits + self.stale_hits) / lookups) if lookups else 0.0,
+        })
+        stats["shared"] = {
+            "entries": len(self),
+            "loads": self.loads,
+            "writes": self.writes,
+            "max_entries": self.max_entries,
+        }
+        return stats
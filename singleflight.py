@@ -0,0 +1,215 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block until it finishes and receive the same result or
+    re-raise the same exception.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._execute(key, fn)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def _execute(self, key, fn):
+        return fn()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+            }
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight for coroutines on one event loop"""
+
+    def __init__(self):
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, coro_fn):
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # Detached from the caller, so cancelling the first caller (a client
+            # that went away) does not abort the call for everyone coalesced on it
+            task = asyncio.ensure_future(coro_fn())
+            self._calls[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone
+            task.exception()
+
+    def in_flight(self):
+        return len(self._calls)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+
+class FileSingleFlight(SingleFlight):
+    """SingleFlight that also coalesces across processes on one host.
+
+    Threads are coalesced in-process first; the leader thread then takes an
+    exclusive flock on a per-key lock file in ``directory``. The process that
+    gets the lock first runs the function and writes its result next to the
+    lock file; processes that were waiting on the lock reuse that result if it
+    was written after they started waiting (or within ``result_ttl`` seconds).
+    Results must be serializable with ``dumps``/``loads``; exceptions are not
+    shared across processes, so a waiter retries the call itself. Since ``fn``
+    does not run in a process that reuses a result, ``on_shared(key, result)``
+    is called there instead, e.g. to cache it locally.
+    """
+
+    def __init__(self, directory, result_ttl=2.0, dumps=json.dumps, loads=json.loads,
+                 on_shared=None):
+        if fcntl is None:
+            raise RuntimeError("FileSingleFlight requires fcntl (POSIX only)")
+        super().__init__()
+        self.directory = directory
+        self.result_ttl = result_ttl
+        self._dumps = dumps
+        self._loads = loads
+        self._on_shared = on_shared
+        self.shared_hits = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key):
+        name = hashlib.sha1(str(key).encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, name)
+        return base + ".lock", base + ".result"
+
+    def _execute(self, key, fn):
+        lock_path, result_path = self._paths(key)
+        started = time.time()
+
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                shared = self._read_result(result_path, started)
+                if shared is not None:
+                    self.shared_hits += 1
+                    if self._on_shared is not None:
+                        self._on_shared(key, shared[0])
+                    return shared[0]
+
+                result = fn()
+                self._write_result(result_path, result)
+                return result
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_result(self, result_path, started):
+        try:
+            mtime = os.stat(result_path).st_mtime
+        except FileNotFoundError:
+            return None
+
+        if mtime < started - self.result_ttl:
+            try:
+                os.remove(result_path)
+            except OSError:
+                pass
+            return None
+
+        try:
+            with open(result_path, "r", encoding="utf-8") as f:
+                return (self._loads(f.read()),)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read shared result %s: %s", result_path, e)
+            return None
+
+    def _write_result(self, result_path, result):
+        tmp_path = f"{result_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self._dumps(result))
+            os.replace(tmp_path, result_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Could not share result %s: %s", result_path, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def stats(self):
+        stats = super().stats()
+        stats["shared_hits"] = self.shared_hits
+        return stats
@@ -0,0 +1,45 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+NDJSON_ACCEPT_TYPES = ("application/x-ndjson", "application/ndjson")
+
+
+def wants_ndjson(args, headers):
+    """True when the client asked for NDJSON via ?stream=ndjson or Accept"""
+    stream = args.get("stream")
+    if stream:
+        return stream.lower() == "ndjson"
+
+    accept = headers.get("Accept", "")
+    return any(mimetype in accept for mimetype in NDJSON_ACCEPT_TYPES)
+
+
+def _encode(record):
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def ndjson_lines(records):
+    """Encode records lazily, one JSON document per line.
+
+    Errors raised while producing records cannot change the status code once
+    the body has started, so they are reported as a final error record.
+    """
+    try:
+        for record in records:
+            yield _encode(record)
+    except Exception as e:
+        logger.error("Error while streaming NDJSON: %s", e)
+        yield _encode({"type": "error", "error": str(e)})
+
+
+async def async_ndjson_lines(records):
+    """ndjson_lines for async iterables"""
+    try:
+        async for record in records:
+            yield _encode(record)
+    except Exception as e:
+        logger.error("Error while streaming NDJSON: %s", e)
+        yield _encode({"type": "error", "error": str(e)})
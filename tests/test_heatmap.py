@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from heatmap import Heatmap  # noqa: E402
+from scraper import GeeksforGeeksScraper  # noqa: E402
+from profile_model import profile_digest  # noqa: E402
+
+
+def heat_map(end, days, overrides=None):
+    """One year of heatMapData.result ending at ``end``; zero days are omitted"""
+    result = {}
+    for offset in range(days):
+        day = end - timedelta(days=offset)
+        count = (day.toordinal() * 7) % 6
+        if overrides and day in overrides:
+            count = overrides[day]
+        if count:
+            result[f"{day.isoformat()} 00:00:00"] = count
+    return result
+
+
+def page(result):
+    next_data = {"props": {"pageProps": {
+        "userInfo": {"name": "Geek", "score": 1},
+        "heatMapData": {"result": result},
+    }}}
+    return (
+        '<script id="__NEXT_DATA__" type="application/json">'
+        f"{json.dumps(next_data)}</script>"
+    ).encode()
+
+
+class FakeResponse:
+
+    status_code = 200
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+
+    def iter_content(self, chunk_size=1):
+        yield self.body
+
+    def close(self):
+        pass
+
+
+def scraper_serving(*bodies):
+    scraper = GeeksforGeeksScraper(store=None)
+    responses = iter(bodies)
+    scraper.session.get = lambda *args, **kwargs: FakeResponse(next(responses))
+    return scraper
+
+
+class RefreshedHeatmapTest(unittest.TestCase):
+
+    def test_refresh_matches_cold_fetch(self):
+        today = date.today()
+        old = heat_map(today - timedelta(days=10), 365)
+        # Upstream's window moved on ten days and it rewrote some past days
+        changed_day = today - timedelta(days=40)
+        new = heat_map(today, 365, {changed_day: 0, today - timedelta(days=100): 9})
+
+        refreshed = scraper_serving(page(old), page(new))
+        refreshed.get_profile("geek")
+        refreshed_profile = refreshed.refresh_profile("geek")
+        cold_profile = scraper_serving(page(new)).get_profile("geek")
+
+        self.assertEqual(refreshed_profile.heatmap.start, cold_profile.heatmap.start)
+        self.assertEqual(refreshed_profile.heatmap.counts, cold_profile.heatmap.counts)
+        self.assertEqual(refreshed_profile.heatmap.stats(), cold_profile.heatmap.stats())
+        self.assertEqual(refreshed_profile.heatmap.count(changed_day.toordinal()), 0)
+        self.assertEqual(profile_digest(refreshed_profile), profile_digest(cold_profile))
+
+    def test_covers_only_returned_days(self):
+        today = date.today()
+        heatmap = Heatmap.from_result(heat_map(today, 30))
+        self.assertGreaterEqual(heatmap.start, (today - timedelta(days=29)).toordinal())
+        self.assertLessEqual(heatmap.end, today.toordinal())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from next_data import NextDataReader, NEXT_DATA_OPEN, extract_next_data  # noqa: E402
+
+PAYLOAD = b'{"props": {"pageProps": {"userInfo": {"name": "Geek"}}}}'
+PAGE = (
+    b"<html><head><title>Geek</title></head><body><div>profile</div>"
+    + NEXT_DATA_OPEN + PAYLOAD + b"</script><div>trailer</div></body></html>"
+)
+MISSING_PAGE = b"<html><body><div>Profile does not exist</div></body></html>"
+
+
+def feed_split(body, *cuts):
+    """Feed body as chunks cut at the given offsets; returns (reader, done after each feed)"""
+    reader = NextDataReader()
+    bounds = (0,) + cuts + (len(body),)
+    done = [reader.feed(body[start:end]) for start, end in zip(bounds, bounds[1:])]
+    return reader, done
+
+
+class NextDataReaderTest(unittest.TestCase):
+
+    def test_every_single_chunk_boundary(self):
+        for cut in range(1, len(PAGE)):
+            reader, done = feed_split(PAGE, cut)
+            self.assertEqual(reader.json_bytes(), PAYLOAD, cut)
+            self.assertTrue(done[-1], cut)
+            self.assertFalse(reader.profile_missing(), cut)
+
+    def test_one_byte_chunks(self):
+        reader = NextDataReader()
+        finished_at = None
+        for index in range(len(PAGE)):
+            if reader.feed(PAGE[index:index + 1]):
+                finished_at = index
+                break
+
+        self.assertEqual(reader.json_bytes(), PAYLOAD)
+        # Stops at the closing tag, without reading the trailer
+        self.assertEqual(finished_at, PAGE.index(b"</script>") + len(b"</script>") - 1)
+
+    def test_missing_marker_across_boundaries(self):
+        for cut in range(1, len(MISSING_PAGE)):
+            reader, done = feed_split(MISSING_PAGE, cut)
+            self.assertTrue(reader.profile_missing(), cut)
+            self.assertIsNone(reader.json_bytes(), cut)
+
+    def test_marker_after_next_data_is_ignored(self):
+        body = NEXT_DATA_OPEN + PAYLOAD + b"</script>" + MISSING_PAGE
+        self.assertEqual(extract_next_data(body), (PAYLOAD, False))
+
+    def test_page_without_next_data(self):
+        self.assertEqual(extract_next_data(b"<html><body></body></html>"), (None, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profile_model import Profile, problem_lists, profile_digest  # noqa: E402
+from scraper import GeeksforGeeksScraper  # noqa: E402
+
+
+def next_data():
+    today = date.today()
+    submissions = {
+        difficulty: {
+            str(index): {"pname": f"{difficulty} {index}", "slug": f"{difficulty.lower()}-{index}"}
+            for index in range(count)
+        }
+        for difficulty, count in (("Basic", 2), ("Easy", 3), ("Medium", 1), ("Hard", 0))
+    }
+    return {"props": {"pageProps": {
+        "userInfo": {
+            "name": "Geek",
+            "institute_name": "IIT",
+            "created_date": "2020-01-01",
+            "score": 120,
+            "total_problems_solved": 6,
+            "monthly_score": 7,
+            "pod_solved_longest_streak": 12,
+        },
+        "contestData": {"user_contest_data": {"current_rating": 1500}, "user_global_rank": 42},
+        "userSubmissionsInfo": submissions,
+        "languages": "C++, Python",
+        "heatMapData": {"result": {
+            f"{today - timedelta(days=offset)} 00:00:00": offset % 4 + 1
+            for offset in range(0, 40, 3)
+        }},
+    }}}
+
+
+class ProfileSerializationTest(unittest.TestCase):
+
+    def test_round_trip_through_json(self):
+        profile = Profile.from_next_data(next_data())
+        restored = Profile.from_dict(json.loads(json.dumps(profile.to_dict())))
+
+        for field in Profile._FIELDS:
+            if field != "heatmap":
+                self.assertEqual(getattr(restored, field), getattr(profile, field), field)
+        self.assertEqual(restored.heatmap.start, profile.heatmap.start)
+        self.assertEqual(restored.heatmap.counts, profile.heatmap.counts)
+        self.assertEqual(restored.heatmap.stats(), profile.heatmap.stats())
+        self.assertEqual(problem_lists(restored), problem_lists(profile))
+        self.assertEqual(profile_digest(restored), profile_digest(profile))
+
+    def test_restored_strings_are_interned(self):
+        profile = Profile.from_next_data(next_data())
+        restored = Profile.from_dict(json.loads(json.dumps(profile.to_dict())))
+
+        self.assertIs(restored.problem_slugs[0][0], profile.problem_slugs[0][0])
+        self.assertIs(restored.languages[0], profile.languages[0])
+
+    def test_shared_singleflight_result_round_trip(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with mock.patch.dict(os.environ, {"SINGLEFLIGHT_DIR": directory.name}):
+            scraper = GeeksforGeeksScraper(store=None)
+
+        profile = Profile.from_next_data(next_data())
+        flight = scraper.singleflight
+        restored, size = flight._loads(flight._dumps((profile, 1234)))
+
+        self.assertEqual(size, 1234)
+        self.assertEqual(profile_digest(restored), profile_digest(profile))
+
+
+if __name__ == "__main__":
+    unittest.main()
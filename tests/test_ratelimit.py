@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import MemoryRateLimiter, SQLiteRateLimiter  # noqa: E402
+
+
+class FakeClock:
+
+    def __init__(self, now=6000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class MemoryRateLimiterTest(unittest.TestCase):
+
+    def make_limiter(self, limit, window, clock):
+        return MemoryRateLimiter(limit, window, clock=clock)
+
+    def test_limits_within_window(self):
+        limiter = self.make_limiter(3, 60, FakeClock())
+
+        self.assertEqual([limiter.hit("ip") for _ in range(4)], [False, False, False, True])
+        self.assertFalse(limiter.hit("other"))
+        self.assertEqual((limiter.allowed, limiter.rejected), (4, 1))
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        clock = FakeClock()
+        limiter = self.make_limiter(4, 60, clock)
+        for _ in range(4):
+            limiter.hit("ip")
+
+        # Halfway through the next window half of the old count still applies
+        clock.now += 90
+        self.assertEqual([limiter.hit("ip") for _ in range(3)], [False, False, True])
+
+    def test_counts_reset_after_two_windows(self):
+        clock = FakeClock()
+        limiter = self.make_limiter(2, 60, clock)
+        limiter.hit("ip")
+        limiter.hit("ip")
+
+        clock.now += 120
+        self.assertFalse(limiter.hit("ip"))
+
+    def test_cost_counts_several_requests(self):
+        limiter = self.make_limiter(10, 60, FakeClock())
+
+        self.assertFalse(limiter.hit("ip", cost=8))
+        self.assertTrue(limiter.hit("ip", cost=3))
+        self.assertFalse(limiter.hit("ip", cost=2))
+
+    def test_rejected_requests_do_not_count(self):
+        limiter = self.make_limiter(2, 60, FakeClock())
+        for _ in range(10):
+            limiter.hit("ip")
+
+        self.assertEqual(limiter.allowed, 2)
+
+
+class MemoryRateLimiterKeysTest(unittest.TestCase):
+
+    def test_idle_and_excess_keys_expire(self):
+        clock = FakeClock()
+        limiter = MemoryRateLimiter(5, 60, max_keys=3, clock=clock)
+        for key in "abcd":
+            limiter.hit(key)
+        self.assertEqual(len(limiter), 3)
+
+        clock.now += 180
+        limiter.hit("e")
+        self.assertEqual(len(limiter), 1)
+
+
+class SQLiteRateLimiterTest(MemoryRateLimiterTest):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "limits.db")
+
+    def make_limiter(self, limit, window, clock):
+        return SQLiteRateLimiter(self.path, limit, window, clock=clock)
+
+    def test_instances_share_counts(self):
+        clock = FakeClock()
+        first = self.make_limiter(2, 60, clock)
+        second = self.make_limiter(2, 60, clock)
+
+        self.assertFalse(first.hit("ip"))
+        self.assertFalse(second.hit("ip"))
+        self.assertTrue(first.hit("ip"))
+
+
+if __name__ == "__main__":
+    unittest.main()
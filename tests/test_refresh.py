@@ -0,0 +1,78 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import GeeksforGeeksScraper  # noqa: E402
+from profile_store import ProfileStore  # noqa: E402
+
+
+def page(score):
+    next_data = {"props": {"pageProps": {"userInfo": {"name": "Geek", "score": score}}}}
+    return (
+        '<script id="__NEXT_DATA__" type="application/json">'
+        f"{json.dumps(next_data)}</script>"
+    ).encode()
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size=1):
+        yield self.body
+
+    def close(self):
+        pass
+
+
+class RefreshRevalidatesTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = ProfileStore(os.path.join(directory.name, "store.db"), max_age=300)
+        self.scraper = GeeksforGeeksScraper(store=store)
+        self.requests = []
+
+    def serve(self, *responses):
+        responses = iter(responses)
+
+        def get(url, headers=None, **kwargs):
+            self.requests.append(headers or {})
+            return next(responses)
+
+        self.scraper.session.get = get
+
+    def test_refresh_sends_conditional_request_while_store_is_fresh(self):
+        self.serve(
+            FakeResponse(200, page(1), {"ETag": '"v1"'}),
+            FakeResponse(304),
+        )
+        self.scraper.get_profile("geek")
+        profile = self.scraper.refresh_profile("geek")
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1].get("If-None-Match"), '"v1"')
+        self.assertEqual(profile.score, 1)
+
+    def test_refresh_picks_up_changed_profile(self):
+        self.serve(
+            FakeResponse(200, page(1), {"ETag": '"v1"'}),
+            FakeResponse(200, page(2), {"ETag": '"v2"'}),
+        )
+        self.scraper.get_profile("geek")
+        self.scraper.refresh_profile("geek")
+
+        self.assertEqual(self.scraper.get_profile("geek").score, 2)
+        self.assertEqual(self.scraper.store.get("geek").etag, '"v2"')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import gzip
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serialization import ResponseCache, COMPRESS_MIN_BYTES  # noqa: E402
+
+
+def encode(data):
+    return json.dumps(data).encode()
+
+
+def body(size):
+    # json.dumps adds the two quotes
+    return "x" * (size - 2)
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_bytes_count_bodies(self):
+        cache = ResponseCache(encode, max_entries=10, max_bytes=10 ** 6)
+        cache.get("a", lambda: body(100))
+        cache.get("b", lambda: body(300))
+
+        self.assertEqual(cache.bytes(), 400)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_bytes_count_compressed_variants_once(self):
+        cache = ResponseCache(encode, max_entries=10, max_bytes=10 ** 6)
+        size = COMPRESS_MIN_BYTES * 2
+        encoded = cache.get("a", lambda: body(size))
+
+        compressed, coding = encoded.variant("gzip")
+        self.assertEqual(coding, "gzip")
+        self.assertEqual(gzip.decompress(compressed), encoded.body)
+        encoded.variant("gzip")
+
+        self.assertEqual(cache.bytes(), size + len(compressed))
+        self.assertEqual(encoded.size, size + len(compressed))
+
+    def test_small_bodies_are_not_compressed(self):
+        cache = ResponseCache(encode, max_entries=10, max_bytes=10 ** 6)
+        encoded = cache.get("a", lambda: body(100))
+
+        self.assertEqual(encoded.variant("gzip"), (encoded.body, None))
+        self.assertEqual(cache.bytes(), 100)
+
+    def test_evicts_oldest_past_max_bytes(self):
+        cache = ResponseCache(encode, max_entries=10, max_bytes=1000)
+        for key in "abcd":
+            cache.get(key, lambda: body(300))
+        cache.get("a", lambda: body(300))
+
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.bytes(), 900)
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_growth_from_variants_evicts(self):
+        size = COMPRESS_MIN_BYTES * 2
+        cache = ResponseCache(encode, max_entries=10, max_bytes=size * 2 + 10)
+        first = cache.get("a", lambda: body(size))
+        cache.get("b", lambda: body(size))
+
+        first.variant("gzip")
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.bytes(), size)
+
+    def test_evicted_entry_growth_is_not_counted(self):
+        size = COMPRESS_MIN_BYTES * 2
+        cache = ResponseCache(encode, max_entries=1, max_bytes=10 ** 6)
+        first = cache.get("a", lambda: body(size))
+        cache.get("b", lambda: body(size))
+
+        first.variant("gzip")
+
+        self.assertEqual(cache.bytes(), size)
+
+    def test_clear(self):
+        cache = ResponseCache(encode, max_entries=10, max_bytes=10 ** 6)
+        cache.get("a", lambda: body(100))
+        cache.clear()
+
+        self.assertEqual((len(cache), cache.bytes()), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from singleflight import SingleFlight, AsyncSingleFlight, FileSingleFlight  # noqa: E402
+
+
+def run_threads(count, target):
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = target()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return "profile"
+
+        results = run_threads(5, lambda: flight.do("geek", fetch))
+
+        self.assertEqual(results, ["profile"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats()["coalesced"], 4)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_errors_reach_every_caller_and_are_not_kept(self):
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.05)
+            raise ValueError("upstream broke")
+
+        results = run_threads(3, lambda: flight.do("geek", fail))
+
+        self.assertEqual([type(result) for result in results], [ValueError] * 3)
+        self.assertEqual(flight.do("geek", lambda: "profile"), "profile")
+
+    def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do("a", lambda: 1), 1)
+        self.assertEqual(flight.do("b", lambda: 2), 2)
+        self.assertEqual(flight.stats()["executions"], 2)
+
+
+class FileSingleFlightTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_waiting_process_reuses_result(self):
+        # Separate instances only coalesce through the lock file, as processes do
+        shared = []
+        leader = FileSingleFlight(self.directory)
+        follower = FileSingleFlight(
+            self.directory, on_shared=lambda key, result: shared.append((key, result))
+        )
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"score": 1}
+
+        def follow():
+            started.wait(5)
+            return follower.do("geek", fetch)
+
+        def lead():
+            return leader.do("geek", fetch)
+
+        results = {}
+        lead_thread = threading.Thread(target=lambda: results.setdefault("lead", lead()))
+        follow_thread = threading.Thread(target=lambda: results.setdefault("follow", follow()))
+        lead_thread.start()
+        follow_thread.start()
+        time.sleep(0.05)
+        release.set()
+        lead_thread.join()
+        follow_thread.join()
+
+        self.assertEqual(results, {"lead": {"score": 1}, "follow": {"score": 1}})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(shared, [("geek", {"score": 1})])
+        self.assertEqual(follower.stats()["shared_hits"], 1)
+
+    def test_old_results_are_not_reused(self):
+        flight = FileSingleFlight(self.directory, result_ttl=0)
+        self.assertEqual(flight.do("geek", lambda: 1), 1)
+        time.sleep(0.02)
+        self.assertEqual(flight.do("geek", lambda: 2), 2)
+
+    def test_unserializable_result_is_still_returned(self):
+        flight = FileSingleFlight(self.directory)
+        result = object()
+        self.assertIs(flight.do("geek", lambda: result), result)
+
+
+class AsyncSingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "profile"
+
+        async def main():
+            return await asyncio.gather(*(flight.do("geek", fetch) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), ["profile"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats()["coalesced"], 4)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_errors_reach_every_caller(self):
+        flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream broke")
+
+        async def main():
+            return await asyncio.gather(
+                flight.do("geek", fetch), flight.do("geek", fetch), return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+        self.assertEqual([type(result) for result in results], [ValueError, ValueError])
+
+    def test_waiter_survives_cancelled_leader(self):
+        flight = AsyncSingleFlight()
+        release = None
+
+        async def fetch():
+            await release.wait()
+            return "profile"
+
+        async def main():
+            nonlocal release
+            release = asyncio.Event()
+            leader = asyncio.ensure_future(flight.do("geek", fetch))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(flight.do("geek", fetch))
+            await asyncio.sleep(0)
+
+            leader.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await waiter
+
+        self.assertEqual(asyncio.run(main()), "profile")
+        self.assertEqual(flight.stats()["executions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import tempfile
+import unittest
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from upstream import TokenBucket, SQLiteTokenBucket, create_token_bucket  # noqa: E402
+
+
+class FakeClock:
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def take_tokens(path, count, results):
+    bucket = SQLiteTokenBucket(path, rate=0.001, burst=40)
+    results.put(sum(bucket.reserve(max_wait=0) is not None for _ in range(count)))
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def make_bucket(self, clock, rate=10, burst=3):
+        return TokenBucket(rate, burst, clock=clock)
+
+    def test_burst_then_wait(self):
+        clock = FakeClock()
+        bucket = self.make_bucket(clock)
+
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+        # The reserved token is owed, so the next caller waits behind it
+        self.assertAlmostEqual(bucket.reserve(), 0.2)
+        self.assertEqual(bucket.throttled, 2)
+
+    def test_refills_up_to_burst(self):
+        clock = FakeClock()
+        bucket = self.make_bucket(clock)
+        for _ in range(3):
+            bucket.reserve()
+
+        clock.now += 60
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertGreater(bucket.reserve(), 0)
+
+    def test_max_wait_refuses_without_taking_a_token(self):
+        clock = FakeClock()
+        bucket = self.make_bucket(clock, burst=1)
+        bucket.reserve()
+
+        self.assertIsNone(bucket.reserve(max_wait=0.05))
+        self.assertAlmostEqual(bucket.reserve(max_wait=0.5), 0.1)
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(0, 0)
+        self.assertEqual(bucket.reserve(max_wait=0), 0.0)
+
+
+class SQLiteTokenBucketTest(TokenBucketTest):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "bucket.db")
+
+    def make_bucket(self, clock, rate=10, burst=3):
+        return SQLiteTokenBucket(self.path, rate, burst, clock=clock)
+
+    def test_instances_share_one_budget(self):
+        clock = FakeClock()
+        first = self.make_bucket(clock, burst=2)
+        second = self.make_bucket(clock, burst=2)
+
+        self.assertEqual(first.reserve(), 0.0)
+        self.assertEqual(second.reserve(), 0.0)
+        self.assertIsNone(first.reserve(max_wait=0))
+        self.assertIsNone(second.reserve(max_wait=0))
+
+    def test_processes_share_one_budget(self):
+        SQLiteTokenBucket(self.path, rate=0.001, burst=40)
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = [
+            context.Process(target=take_tokens, args=(self.path, 20, results))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        taken = sum(results.get(timeout=60) for _ in processes)
+        for process in processes:
+            process.join()
+
+        self.assertEqual(taken, 40)
+
+    def test_create_token_bucket(self):
+        self.assertIsInstance(create_token_bucket(10, 3, path=self.path), SQLiteTokenBucket)
+        self.assertIs(type(create_token_bucket(10, 3, path=None)), TokenBucket)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,385 @@
+import os
+import time
+import random
+import sqlite3
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from metrics import UPSTREAM_RESPONSES
+from errors import UpstreamBlockedError
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", 10))  # seconds
+UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", 20))
+UPSTREAM_RATE = float(os.getenv("UPSTREAM_RATE", 10))  # requests per second
+UPSTREAM_BURST = int(os.getenv("UPSTREAM_BURST", 20))
+# SQLite file holding one token bucket for every process on the host; unset,
+# each process has its own bucket and may send UPSTREAM_RATE by itself
+UPSTREAM_BUCKET_PATH = os.getenv("UPSTREAM_BUCKET_PATH")
+UPSTREAM_ACQUIRE_TIMEOUT = float(os.getenv("UPSTREAM_ACQUIRE_TIMEOUT", 10))  # seconds
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", 2))
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", 0.5))  # seconds
+UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", 8))  # seconds
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", 30))  # seconds
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(UpstreamBlockedError):
+    pass
+
+
+class UpstreamThrottledError(UpstreamBlockedError):
+    pass
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every outbound request of a process.
+
+    ``reserve`` takes a token immediately and returns how long the caller must
+    wait before using it, which works for both blocking and asyncio callers.
+    The budget is per process: N workers send up to N times ``rate``. Use
+    SQLiteTokenBucket to share one budget between processes.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def reserve(self, max_wait=None):
+        """Reserve one token; returns seconds to wait, or None if that exceeds max_wait"""
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+
+            self._tokens -= 1
+            if wait > 0:
+                self.throttled += 1
+            return wait
+
+    def acquire(self, timeout=None):
+        wait = self.reserve(max_wait=timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """TokenBucket whose state lives in SQLite, shared by every process using ``path``.
+
+    Each reservation is one short write transaction, so this suits the rates
+    upstream tolerates (tens of requests per second), not hot paths.
+    """
+
+    def __init__(self, path, rate, burst, clock=time.time):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._local = threading.local()
+        self.throttled = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_bucket ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO token_bucket (id, tokens, updated) VALUES (0, ?, ?)",
+            (float(burst), clock()),
+        )
+
+    def _connection(self):
+        # Per thread and per process; forked workers must not reuse a parent's
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def reserve(self, max_wait=None):
+        """Reserve one token; returns seconds to wait, or None if that exceeds max_wait"""
+        if self.rate <= 0:
+            return 0.0
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated = conn.execute(
+                "SELECT tokens, updated FROM token_bucket WHERE id = 0"
+            ).fetchone()
+            now = self._clock()
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                conn.execute("ROLLBACK")
+                return None
+
+            conn.execute(
+                "UPDATE token_bucket SET tokens = ?, updated = ? WHERE id = 0",
+                (tokens - 1, max(now, updated)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        if wait > 0:
+            self.throttled += 1
+        return wait
+
+
+def create_token_bucket(rate, burst, path=UPSTREAM_BUCKET_PATH):
+
+    if path:
+        return SQLiteTokenBucket(path, rate, burst)
+    return TokenBucket(rate, burst)
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures.
+
+    Closed: requests flow. After ``failure_threshold`` consecutive failures the
+    breaker opens and rejects requests for ``reset_timeout`` seconds, then lets
+    a single trial request through (half-open); its outcome closes or reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_request(self):
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError("Upstream is unavailable; circuit breaker is open")
+
+    def release_trial(self):
+        """Give back a half-open trial slot that was never used"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or (
+                state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+                self.opened += 1
+                logger.warning("Upstream circuit breaker opened after %s failures", self._failures)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class UpstreamClient:
+    """Outbound HTTP layer for GeeksforGeeks requests.
+
+    Wraps a ``requests.Session`` with an explicitly sized keep-alive pool, a
+    token bucket (per process, or host-wide with UPSTREAM_BUCKET_PATH), bounded retries with jittered exponential backoff on
+    429/5xx and connection errors, and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        headers=None,
+        pool_size=UPSTREAM_POOL_SIZE,
+        rate=UPSTREAM_RATE,
+        burst=UPSTREAM_BURST,
+        acquire_timeout=UPSTREAM_ACQUIRE_TIMEOUT,
+        max_retries=UPSTREAM_MAX_RETRIES,
+        backoff_base=UPSTREAM_BACKOFF_BASE,
+        backoff_max=UPSTREAM_BACKOFF_MAX,
+        breaker=None,
+        bucket=None,
+    ):
+        self.pool_size = pool_size
+        self.acquire_timeout = acquire_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = bucket or create_token_bucket(rate, burst)
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        # pool_block keeps us at pool_size sockets instead of opening throwaway ones
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True, max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._adapter = adapter
+
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def before_request(self):
+        """Check the breaker and take a token; returns seconds to wait before sending"""
+        self.breaker.before_request()
+        wait = self.bucket.reserve(max_wait=self.acquire_timeout)
+        if wait is None:
+            self.breaker.release_trial()
+            raise UpstreamThrottledError("Upstream request budget exhausted; try again later")
+        return wait
+
+    def backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, honouring a numeric Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+            except ValueError:
+                pass
+        return delay
+
+    def track_in_flight(self, delta):
+        with self._lock:
+            self.in_flight += delta
+            if delta > 0:
+                self.requests += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+        self.breaker.record_failure()
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", UPSTREAM_TIMEOUT)
+
+        for attempt in range(self.max_retries + 1):
+            wait = self.before_request()
+            if wait > 0:
+                time.sleep(wait)
+
+            self.track_in_flight(1)
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.RequestException as e:
+                UPSTREAM_RESPONSES.labels(status="error").inc()
+                self.record_failure()
+                retryable = isinstance(e, (requests.ConnectionError, requests.Timeout))
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                logger.warning("Upstream request failed (%s), retrying", e)
+                self.record_retry()
+                time.sleep(self.backoff(attempt))
+                continue
+            finally:
+                self.track_in_flight(-1)
+
+            UPSTREAM_RESPONSES.labels(status=response.status_code).inc()
+            if response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success()
+                return response
+
+            self.record_failure()
+            if attempt >= self.max_retries:
+                return response
+
+            logger.warning("Upstream returned %s for %s, retrying", response.status_code, url)
+            self.record_retry()
+            delay = self.backoff(attempt, response.headers.get("Retry-After"))
+            response.close()
+            time.sleep(delay)
+
+    def pool_stats(self):
+        connections = 0
+        in_use = 0
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            connections += pool.num_connections
+            in_use += pool.pool.maxsize - pool.pool.qsize()
+        return {"size": self.pool_size, "in_use": in_use, "connections_created": connections}
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+            }
+        stats["throttled"] = self.bucket.throttled
+        stats["pool"] = self.pool_stats()
+        stats["breaker"] = self.breaker.stats()
+        return stats
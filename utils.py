@@ -1,64 +1,82 @@
+import os
 import re
-import time
+import math
 from datetime import datetime, timedelta
 import logging
+from ratelimit import create_rate_limiter
+from metrics import RATE_LIMIT_REJECTIONS
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-rate_limit_storage = {}
 RATE_LIMIT_WINDOW = 60  # seconds
-MAX_REQUESTS_PER_WINDOW = 10  # max requests
+MAX_REQUESTS_PER_WINDOW = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", 10))  # max requests
+BATCH_MAX_USERNAMES = 100  # max usernames per batch request
+BATCH_USERNAMES_PER_RATE_LIMIT_UNIT = 25  # usernames counted as one request
+USERNAME_PATTERN = re.compile(r'[a-zA-Z0-9_\-]{3,50}')
+
+# Profile section routes served by app.py and asgi.py:
+# (endpoint, path, scraper section, description for logs)
+SECTION_ROUTES = (
+    ("get_profile", "/api/profile", "profile", "profile"),
+    ("get_basic_info", "/api/basic-info", "info", "basic info"),
+    ("get_coding_stats", "/api/coding-stats", "coding_stats", "coding stats"),
+    ("get_submission_data", "/api/submission-data", "submission_data", "submission data"),
+    ("get_difficulty_stats", "/api/difficulty-stats", "difficulty_stats", "difficulty stats"),
+    ("get_institution_languages", "/api/institution-languages", "institution_languages",
+     "institution and languages"),
+    ("get_streak", "/api/streak", "streak", "streak"),
+)
+
+# Backend chosen by RATE_LIMIT_BACKEND (memory, or sqlite to share across workers)
+rate_limiter = create_rate_limiter(MAX_REQUESTS_PER_WINDOW, RATE_LIMIT_WINDOW)
 
 def validate_username(username):
     
-    if not username:
-        logger.warning("Empty username provided")
-        return False
-    
-    if not isinstance(username, str):
-        logger.warning(f"Username not a string: {type(username)}")
-        return False
-    
-    if len(username) < 3 or len(username) > 50:
-        logger.warning(f"Username length invalid: {len(username)}")
-        return False
+    # Valid names take a single compiled fullmatch
+    if isinstance(username, str) and USERNAME_PATTERN.fullmatch(username):
+        return True
     
-    pattern = r'^[a-zA-Z0-9_\-]+$'
-    if not re.match(pattern, username):
-        logger.warning(f"Username format invalid: {username}")
-        return False
+    # Rejections are client errors, so they are only logged at DEBUG
+    if not username:
+        logger.debug("Empty username provided")
+    elif not isinstance(username, str):
+        logger.debug("Username not a string: %s", type(username))
+    elif len(username) < 3 or len(username) > 50:
+        logger.debug("Username length invalid: %d", len(username))
+    else:
+        logger.debug("Username format invalid: %r", username)
+    return False
+
+def is_rate_limited(ip_address, cost=1):
     
-    return True
+    if rate_limiter.hit(ip_address, cost):
+        RATE_LIMIT_REJECTIONS.inc()
+        return True
+    return False
 
-def is_rate_limited(ip_address):
+def batch_rate_limit_cost(batch_size):
     
-    current_time = time.time()
+    return max(1, math.ceil(batch_size / BATCH_USERNAMES_PER_RATE_LIMIT_UNIT))
+
+def parse_batch_request(payload, valid_sections, default_sections=("profile",)):
     
-    if ip_address not in rate_limit_storage:
-        rate_limit_storage[ip_address] = []
+    if not isinstance(payload, dict):
+        return None, None, "Request body must be a JSON object"
     
-    rate_limit_storage[ip_address] = [
-        ts for ts in rate_limit_storage[ip_address]
-        if ts > current_time - RATE_LIMIT_WINDOW
-    ]
+    usernames = payload.get("usernames")
+    if not isinstance(usernames, list) or not usernames:
+        return None, None, "'usernames' must be a non-empty list"
     
-    # Check if rate limit exceeded
-    if len(rate_limit_storage[ip_address]) >= MAX_REQUESTS_PER_WINDOW:
-        logger.warning(f"Rate limit exceeded for IP: {ip_address}")
-        return True
+    if len(usernames) > BATCH_MAX_USERNAMES:
+        return None, None, f"At most {BATCH_MAX_USERNAMES} usernames are allowed per batch"
     
-    rate_limit_storage[ip_address].append(current_time)
+    sections = payload.get("sections") or list(default_sections)
+    if not isinstance(sections, list) or not all(
+        isinstance(section, str) and section in valid_sections for section in sections
+    ):
+        return None, None, f"'sections' must be a list of: {', '.join(valid_sections)}"
     
-    if current_time % 300 < 1:  
-        cleanup_rate_limit_storage()
-    return False
-
-def cleanup_rate_limit_storage():
-    global rate_limit_storage
-    rate_limit_storage = {ip: timestamps for ip, timestamps in rate_limit_storage.items() if timestamps}
-    logger.debug(f"Rate limit storage cleaned up. Current size: {len(rate_limit_storage)}")
+    return usernames, list(dict.fromkeys(sections)), None
 
 def parse_html_text(html_text):
     
@@ -97,5 +115,5 @@ def format_date(date_string):
         return date_string.strip()
     
     except Exception as e:
-        logger.error(f"Error formatting date '{date_string}': {str(e)}")
+        logger.error("Error formatting date '%s': %s", date_string, e)
         return date_string